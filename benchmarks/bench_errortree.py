@@ -0,0 +1,82 @@
+# benchmarks/bench_errortree.py
+#
+# Times ErrorTree construction over wide and deep synthetic metaconfs of growing size.
+# Run from the repository root with `python -m benchmarks.bench_errortree`.
+#
+# The time per section should stay flat as the number of sections grows. The script exits
+# with an error if the largest size costs more than MAX_GROWTH times as much per section
+# as the smallest one.
+
+import sys
+import time
+
+import termaconfig as tc
+import termaconfig.utils as util
+
+SIZES = [100, 400, 1600, 6400]
+OPTIONS_PER_SECTION = 4
+# Generous, since timings are noisy. Quadratic or worse growth blows well past this.
+MAX_GROWTH = 3.0
+REPEATS = 5
+
+
+def make_metaconf(sections, shape):
+    """Creates a metaconf with the given number of sections, every option holding an error.
+
+    shape is either 'wide' (sections spread over a few levels, many siblings each)
+    or 'deep' (nested chains 50 levels deep).
+    """
+    metaconf = {}
+    for index in range(sections):
+        if shape == "wide":
+            path = f"top{index % 10}.sec{index}"
+            if f"top{index % 10}" not in metaconf:
+                path = f"top{index % 10}"
+        else:
+            chain, depth = divmod(index, 50)
+            path = ".".join([f"chain{chain}"] + [f"lvl{level}" for level in range(depth)])
+
+        section = util.fill_required_keys({"data": {}}, tc.REQUIRED_SEC_KEYS)
+        for option in range(OPTIONS_PER_SECTION):
+            data = util.fill_required_keys({}, tc.REQUIRED_PARAM_KEYS)
+            data.update({"missing": False, "error": "the value is too small.", "min": "1"})
+            section["data"][f"option{option}"] = data
+        metaconf[path] = section
+    return metaconf
+
+
+def time_errortree(metaconf):
+    best = None
+    for _ in range(REPEATS):
+        start = time.perf_counter()
+        tc.ErrorTree(metaconf)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def main():
+    failed = False
+    for shape in ("wide", "deep"):
+        per_section = []
+        for size in SIZES:
+            metaconf = make_metaconf(size, shape)
+            elapsed = time_errortree(metaconf)
+            per_section.append(elapsed / size)
+            print(
+                f"{shape:>5} {size:>6} sections: {elapsed * 1000:8.2f} ms "
+                f"({per_section[-1] * 1e6:.2f} us/section)"
+            )
+
+        growth = per_section[-1] / per_section[0]
+        print(f"{shape:>5} growth per section: {growth:.2f}x")
+        if growth > MAX_GROWTH:
+            failed = True
+
+    if failed:
+        print(f"ErrorTree construction grew faster than linear (over {MAX_GROWTH}x)")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
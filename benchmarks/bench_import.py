@@ -0,0 +1,69 @@
+# benchmarks/bench_import.py
+#
+# Measures how long a cold `import termaconfig` takes, using `python -X importtime` in fresh
+# interpreters. Run from the repository root with `python -m benchmarks.bench_import`.
+#
+# Pass --budget to exit with an error when the import gets slower than a number of milliseconds,
+# eg in CI: `python -m benchmarks.bench_import --budget 100`
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def import_times(statement):
+    """Imports in a fresh interpreter, returning `{module: (self_us, cumulative_us)}`."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", statement],
+        capture_output=True,
+        text=True,
+        check=True,
+        cwd=ROOT,
+    )
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        self_us, cumulative_us, module = (part.strip() for part in line[12:].split("|"))
+        if not self_us.isdigit():
+            continue
+        times[module] = (int(self_us), int(cumulative_us))
+    return times
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the cold import of termaconfig.")
+    parser.add_argument("--repeats", type=int, default=10, help="Runs to take (default: 10)")
+    parser.add_argument("--top", type=int, default=10, help="Slowest modules to list")
+    parser.add_argument("--budget", type=float, help="Fail if the median is over this many ms")
+    parser.add_argument(
+        "--statement", default="import termaconfig", help="What to import (default: the package)"
+    )
+    args = parser.parse_args()
+
+    runs = [import_times(args.statement) for _ in range(args.repeats)]
+    totals = [run["termaconfig"][1] / 1000 for run in runs if "termaconfig" in run]
+    if not totals:
+        sys.exit(f"termaconfig wasn't imported by: {args.statement}")
+    median = statistics.median(totals)
+    print(f"{args.statement}: median {median:.2f}ms, best {min(totals):.2f}ms")
+
+    # Modules by their median self time, to see what the import spends its time on
+    modules = {}
+    for run in runs:
+        for module, (self_us, _) in run.items():
+            modules.setdefault(module, []).append(self_us)
+    slowest = sorted(modules.items(), key=lambda item: statistics.median(item[1]), reverse=True)
+    for module, self_times in slowest[: args.top]:
+        print(f"  {statistics.median(self_times) / 1000:>8.2f}ms  {module}")
+
+    if args.budget is not None and median > args.budget:
+        sys.exit(f"Import took {median:.2f}ms, over the budget of {args.budget:.2f}ms")
+
+
+if __name__ == "__main__":
+    main()
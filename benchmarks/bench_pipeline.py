@@ -0,0 +1,187 @@
+# benchmarks/bench_pipeline.py
+#
+# Times every stage of loading a config over synthetic spec/config pairs of various shapes.
+# Run from the repository root with `python -m benchmarks.bench_pipeline`.
+#
+# Results are saved as JSON (by default to benchmarks/results/<commit>.json), so a run can be
+# compared against one from another commit. `--tree` times the package from another checkout,
+# which works back to trees from before CompiledSpec existed:
+#
+#     git worktree add /tmp/main main
+#     python -m benchmarks.bench_pipeline --tree /tmp/main --save main.json
+#     python -m benchmarks.bench_pipeline --compare main.json
+
+import argparse
+import importlib
+import io
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+
+from configobj import ConfigObj
+from configobj.validate import Validator
+from terminaltables3 import AsciiTable
+
+from benchmarks.generate import make_spec_config
+
+RESULTS_DIR = os.path.join(os.path.dirname(__file__), "results")
+STAGES = ["spec", "preprocess", "configobj", "validate", "parser", "errortree", "tables"]
+
+# Each scenario stresses one thing on top of a small base shape
+SCENARIOS = {
+    "base": {"width": 20, "depth": 1},
+    "wide": {"width": 400, "depth": 1},
+    "deep": {"width": 10, "depth": 30},
+    "types": {"width": 40, "depth": 1, "type_items": 200},
+    "parents": {"width": 200, "depth": 0, "parent_chain": 199},
+    "toggles": {"width": 200, "depth": 1, "toggles": 150},
+    "errors": {"width": 200, "depth": 1, "error_density": 0.5},
+}
+
+
+def load_package(tree=None):
+    """Imports termaconfig, from the checkout at `tree` if given rather than this one."""
+    if tree:
+        sys.path.insert(0, os.path.abspath(tree))
+    return importlib.import_module("termaconfig")
+
+
+def run_pipeline(tc, spec_text, config_text):
+    """Runs every stage once, returning the time each one took in seconds."""
+    timings = {}
+
+    def timed(stage, func):
+        start = time.perf_counter()
+        result = func()
+        timings[stage] = time.perf_counter() - start
+        return result
+
+    preprocess_config = importlib.import_module("termaconfig.utils").preprocess_config
+    if not hasattr(tc, "CompiledSpec"):
+        # Trees from before CompiledSpec: time the same steps TermaConfig took back then
+        spec = timed(
+            "spec",
+            lambda: ConfigObj(
+                preprocess_config(io.StringIO(spec_text)), list_values=False, _inspec=True
+            ),
+        )
+        lines = timed("preprocess", lambda: preprocess_config(io.StringIO(config_text)))
+        config = timed("configobj", lambda: ConfigObj(lines, configspec=spec))
+        result = timed("validate", lambda: config.validate(Validator(), preserve_errors=True))
+        parser = timed("parser", lambda: tc.ConfigParser(config, config.configspec, result))
+        timed("errortree", lambda: tc.ErrorTree(parser.metaconf).get_tree)
+        timed(
+            "tables",
+            lambda: tc.ConfigTables(parser.metaconf, config, tabletype=AsciiTable).all_tables,
+        )
+        return timings
+
+    spec = timed("spec", lambda: tc.CompiledSpec(io.StringIO(spec_text)))
+    configspec = getattr(spec, "validation_spec", spec.configspec)
+    lines = timed("preprocess", lambda: preprocess_config(io.StringIO(config_text)))
+    config = timed("configobj", lambda: ConfigObj(lines, configspec=configspec))
+    result = timed("validate", lambda: config.validate(spec.validator, preserve_errors=True))
+    parser = timed("parser", lambda: tc.ConfigParser(config, spec, result))
+    timed("errortree", lambda: tc.ErrorTree(parser.metaconf, index=parser.index).get_tree)
+    timed(
+        "tables",
+        lambda: (
+            tc.ConfigTables(
+                parser.metaconf, config, tabletype=AsciiTable, spec=spec, index=parser.index
+            ).all_tables
+        ),
+    )
+    return timings
+
+
+def bench_scenario(tc, params, repeats):
+    """Runs a scenario several times, keeping the best and median time of each stage."""
+    spec_text, config_text = make_spec_config(**params)
+    runs = [run_pipeline(tc, spec_text, config_text) for _ in range(repeats)]
+    return {
+        "params": params,
+        "config_lines": config_text.count("\n"),
+        "stages": {
+            stage: {
+                "best": min(run[stage] for run in runs),
+                "median": statistics.median(run[stage] for run in runs),
+            }
+            for stage in STAGES
+        },
+    }
+
+
+def git_commit(tree=None):
+    try:
+        return subprocess.run(
+            ["git", "-C", tree or ".", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def print_results(results, baseline=None):
+    header = f"{'scenario':<10}" + "".join(f"{stage:>12}" for stage in STAGES)
+    print(header)
+    for name, scenario in results["scenarios"].items():
+        row = f"{name:<10}"
+        for stage in STAGES:
+            best = scenario["stages"][stage]["best"]
+            row += f"{best * 1000:>10.2f}ms"
+        print(row)
+        if baseline and name in baseline["scenarios"]:
+            row = f"{'  change':<10}"
+            for stage in STAGES:
+                old = baseline["scenarios"][name]["stages"].get(stage, None)
+                new = scenario["stages"][stage]["best"]
+                row += f"{new / old['best']:>11.2f}x" if old and old["best"] else f"{'-':>12}"
+            print(row)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark each stage of loading a config.")
+    parser.add_argument("--repeats", type=int, default=5, help="Runs per scenario (default: 5)")
+    parser.add_argument(
+        "--scenario", action="append", choices=SCENARIOS, help="Only run these scenarios"
+    )
+    parser.add_argument("--save", help="Where to save results (default: results/<commit>.json)")
+    parser.add_argument("--compare", help="A saved results file to compare against")
+    parser.add_argument("--tree", help="Benchmark the termaconfig package from another checkout")
+    args = parser.parse_args()
+
+    tc = load_package(args.tree)
+    commit = git_commit(args.tree)
+    results = {
+        "commit": commit,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "repeats": args.repeats,
+        "scenarios": {},
+    }
+    for name in args.scenario or SCENARIOS:
+        results["scenarios"][name] = bench_scenario(tc, SCENARIOS[name], args.repeats)
+
+    baseline = None
+    if args.compare:
+        with open(args.compare) as file:
+            baseline = json.load(file)
+        print(f"Comparing {commit} against {baseline['commit']} (best of {args.repeats})")
+    print_results(results, baseline)
+
+    save_path = args.save or os.path.join(RESULTS_DIR, f"{commit}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(save_path)), exist_ok=True)
+    with open(save_path, "w") as file:
+        json.dump(results, file, indent=2)
+    print(f"Results saved to {save_path}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+# benchmarks/generate.py
+#
+# Generates synthetic spec/config pairs for benchmarking. Every knob that changes how much
+# work a pipeline stage does can be set on its own, so a slow stage can be tracked down to
+# the shape of config that triggers it.
+
+import random
+
+LIST_TYPES = ["list_values", "list_keys", "list_all"]
+
+
+def make_spec_config(**kwargs):
+    """Creates the text of a matching spec and config.
+
+    Every top-level section `sec{n}` holds integer, string and boolean options, a chain of nested
+    subsections and optionally a `__type` list subsection. Integer options can be given values
+    outside of their range to produce validation errors.
+
+    Args:
+        width (int): Number of top-level sections.
+        depth (int): Levels of nested subsections under each top-level section.
+        options (int): Options per section (at least 3, one of each type).
+        type_items (int): Entries in each section's `__type` list subsection. 0 for none.
+        parent_chain (int): Number of top-level sections merged through `__parent`. Each one is
+            merged into the next, so the tables chain together.
+        toggles (int): Number of top-level sections with a `__toggle` pointing at another
+            section's `enabled` option.
+        error_density (float): Fraction (0 to 1) of integer options given invalid values.
+        seed (int): Seed for picking which options get errors.
+
+    Returns:
+        tuple: The spec text and the config text.
+    """
+    width = kwargs.get("width", 10)
+    depth = kwargs.get("depth", 1)
+    options = max(kwargs.get("options", 6), 3)
+    type_items = kwargs.get("type_items", 0)
+    parent_chain = min(kwargs.get("parent_chain", 0), width - 1)
+    toggles = min(kwargs.get("toggles", 0), width - 1)
+    error_density = kwargs.get("error_density", 0.0)
+    rng = random.Random(kwargs.get("seed", 0))
+
+    spec = []
+    config = []
+
+    def add_options(path):
+        for index in range(options):
+            kind = index % 3
+            name = f"opt{index}"
+            if kind == 0:
+                spec.append(f'{name} = "integer(min=0, max=1000, default={index})"')
+                value = -1 if rng.random() < error_density else rng.randint(0, 1000)
+                config.append(f"{name} = {value}")
+            elif kind == 1:
+                spec.append(f'{name} = "string(default=value{index})"')
+                config.append(f'{name} = "{path} value {index}"')
+            else:
+                spec.append(f'{name} = "boolean(default=true)"')
+                config.append(f"{name} = {'true' if index % 2 else 'false'}")
+            spec.append(f'{name}__title = "Option {index} of {path}"')
+
+    for section in range(width):
+        path = f"sec{section}"
+        spec.append(f"[{path}]")
+        config.append(f"[{path}]")
+        spec.append(f'__title = "Section {section}"')
+        spec.append("__header = \"'Option', 'Value'\"")
+        if section < parent_chain:
+            spec.append(f'__parent = "sec{section + 1}"')
+        # Toggled sections point back at an earlier section, which always stays enabled
+        if width - toggles <= section:
+            spec.append(f'__toggle = "sec{section - width + toggles}.enabled"')
+        spec.append('enabled = "boolean(default=true)"')
+        config.append("enabled = true")
+        add_options(path)
+
+        if type_items:
+            spec.append("[[items]]")
+            config.append("[[items]]")
+            spec.append(f'__type = "{LIST_TYPES[section % len(LIST_TYPES)]}"')
+            spec.append(f'__title = "Items of {path}"')
+            spec.append("__wrap = 4")
+            for item in range(type_items):
+                config.append(f'item{item} = "Item {item}"')
+
+        for level in range(1, depth + 1):
+            brackets = level + 1
+            name = f"sub{level}"
+            spec.append(f"{'[' * brackets}{name}{']' * brackets}")
+            config.append(f"{'[' * brackets}{name}{']' * brackets}")
+            spec.append(f'__title = "Level {level} of {path}"')
+            add_options(f"{path}.{name}")
+
+    return "\n".join(spec) + "\n", "\n".join(config) + "\n"
@@ -22,6 +22,8 @@ if __name__ == "__main__":
             # Try passing another! Another valid option is AsciiTable
             # SingleTable is used by default if none was provided.
             tabletype=DoubleTable,
+            # Tables and errors are printed to stdout by default. Set logging to use the
+            # root logger instead, or pass output= any text stream, logger or callable.
             logging=False,
         )
     except ConfigValidationError:
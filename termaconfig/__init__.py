@@ -1,103 +1,594 @@
 # termaconfig/__init__.py
 
 __name__ = "termaconfig"
-__version__ = "1.0.1"
 __authors__ = ["Zentheon <zentheon@mailbox.org>"]
 __license__ = "GPL-3.0"
 
+import functools
+import importlib
 import io
+import itertools
 import logging as log
+import sys
 
 from configobj import ConfigObj
-from configobj.validate import Validator
 
-from termaconfig.configtables import ConfigTables
-from termaconfig.errortree import ErrorTree
 from termaconfig.exceptions import ConfigValidationError, TableTypeError
+from termaconfig.graph import SectionGraph
+from termaconfig.index import PathIndex
+from termaconfig.output import make_sink
 from termaconfig.parser import ConfigParser
-from termaconfig.utils import preprocess_config
+from termaconfig.records import REQUIRED_PARAM_KEYS, REQUIRED_SEC_KEYS, ParamMeta, SectionMeta
+from termaconfig.spec import CompiledSpec
+from termaconfig.stats import LoadStats, StageStats
+from termaconfig.utils import (
+    error_budget,
+    flatten_sections,
+    get_nested_value,
+    iter_sections,
+    preprocess_config,
+)
+from termaconfig.version import __version__
+
+# Kept in termaconfig.version, so submodules can read it without importing the package
+__version__ = __version__
 
 # Access the main classes from package root
 ConfigValidationError = ConfigValidationError
 TableTypeError = TableTypeError
+PathIndex = PathIndex
+REQUIRED_SEC_KEYS = REQUIRED_SEC_KEYS
+REQUIRED_PARAM_KEYS = REQUIRED_PARAM_KEYS
+SectionMeta = SectionMeta
+ParamMeta = ParamMeta
+StageStats = StageStats
+SectionGraph = SectionGraph
+
+# Only needed for rendering, batches or asyncio, so they're imported when first accessed.
+# Keeps `import termaconfig` quick for tools that only need validated values
+_LAZY_ATTRS = {
+    "ConfigTables": "termaconfig.configtables",
+    "ErrorTree": "termaconfig.errortree",
+    "FileResult": "termaconfig.batch",
+    "validate_many": "termaconfig.batch",
+    "NativeTable": "termaconfig.tables",
+    "NativeAsciiTable": "termaconfig.tables",
+    "NativeSingleTable": "termaconfig.tables",
+    "NativeDoubleTable": "termaconfig.tables",
+    "native_table": "termaconfig.tables",
+    "iter_option_records": "termaconfig.structured",
+    "iter_error_records": "termaconfig.structured",
+    "write_records": "termaconfig.structured",
+}
+
+
+def __getattr__(name):
+    if name not in _LAZY_ATTRS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(_LAZY_ATTRS[name]), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_LAZY_ATTRS))
+
+
+# eager: build and print everything up front. lazy: build metaconf, the error tree and tables on
+# first access. never: like lazy, but tables are never built
+RENDER_MODES = ("eager", "lazy", "never")
+# text: tables and error trees for terminals. json/ndjson: records for machines, see structured.py
+OUTPUT_FORMATS = ("text", "json", "ndjson")
+
+
+def _section_remover(parent, key):
+    """Removes a subsection, returning a function that puts the same section back in place."""
+    section = dict.__getitem__(parent, key)
+    index = parent.sections.index(key)
+    comments = parent.comments[key], parent.inline_comments[key]
+    del parent[key]
+
+    def restore():
+        dict.__setitem__(parent, key, section)
+        parent.sections.insert(index, key)
+        parent.comments[key], parent.inline_comments[key] = comments
 
-# All valid options should be initialized with None
-REQUIRED_SEC_KEYS = ["title", "header", "type", "wrap", "parent", "spacer", "ignore", "toggle"]
-REQUIRED_PARAM_KEYS = [
-    "default",
-    "type",
-    "min",
-    "max",
-    "error",
-    "missing",
-    "title",
-    "note",
-    "ignore",
-]
+    return restore
+
+
+def _scalars_restorer(section):
+    """Returns a function that sets a section's values back to what they are now."""
+    scalars = [
+        (key, dict.__getitem__(section, key), section.comments[key], section.inline_comments[key])
+        for key in section.scalars
+    ]
+    defaults = list(section.defaults)
+
+    def restore():
+        for key in list(section.scalars):
+            del section[key]
+        for key, value, comments, inline_comment in scalars:
+            section[key] = value
+            section.comments[key], section.inline_comments[key] = comments, inline_comment
+        section.defaults[:] = defaults
+
+    return restore
+
+
+def _metaconf_restorer(parser, sections):
+    """Returns a function that puts back the current metaconf entries of the given sections."""
+    vtd_result = parser.vtd_result
+    entries = {path: parser.metaconf[path] for path in sections if path in parser.metaconf}
+
+    def restore():
+        parser.vtd_result = vtd_result
+        parser.metaconf.update(entries)
+        for path, entry in entries.items():
+            parser.index.add_section(path, entry)
+
+    return restore
 
 
 class TermaConfig(ConfigObj):
     def __init__(self, config_file, spec_file, **kwargs):
         config_file, spec_file = self.validate_files(config_file, spec_file)
+        self.render_mode = kwargs.get("render", "eager")
+        if self.render_mode not in RENDER_MODES:
+            raise ValueError(
+                f"Expected render to be one of {', '.join(RENDER_MODES)}, got: {self.render_mode}"
+            )
+        self.output_format = kwargs.get("output_format", "text")
+        if self.output_format not in OUTPUT_FORMATS:
+            raise ValueError(
+                f"Expected output_format to be one of {', '.join(OUTPUT_FORMATS)}, "
+                f"got: {self.output_format}"
+            )
+        # How many errors to report before stopping, None for all of them
+        self.max_errors = error_budget(
+            kwargs.get("max_errors", None), kwargs.get("fail_fast", False)
+        )
 
-        config_lines = preprocess_config(config_file)
-        spec_lines = preprocess_config(spec_file)
-        super().__init__(config_lines, configspec=spec_lines)
-        # This is how we access the config options after letting ConfigObj initialize
-        config = self.__dict__["parent"]
+        # Timings for each loading stage, recorded with stats=True or a hook
+        self.stats = LoadStats(
+            enabled=kwargs.get("stats", False),
+            trace_memory=kwargs.get("trace_memory", False),
+            hook=kwargs.get("hook", None),
+        )
 
-        result = config.validate(Validator(), preserve_errors=True)
+        # A CompiledSpec can be passed in directly to skip parsing the same spec again
+        if isinstance(spec_file, CompiledSpec):
+            self.spec = spec_file
+        else:
+            with self.stats.stage("spec") as stage:
+                self.spec = CompiledSpec(
+                    spec_file,
+                    delimiter=kwargs.get("delimiter", "__"),
+                    cache_dir=kwargs.get("cache_dir", None),
+                )
+                stage.nodes = len(self.spec.sections)
 
-        parser = ConfigParser(config, config.configspec, result)
-        self.metaconf = parser.metaconf
+        # Kept so reload() can use the same options and default to the same file
+        self.options = kwargs
+        # Error trees and tables are written out line by line. Logging is kept for compatibility
+        default_output = log.getLogger() if kwargs.get("logging", False) else sys.stdout
+        output = kwargs.get("output", default_output)
+        self.output = make_sink(output)
+        # Tables printed to a stream end with a blank line, like print() used to leave
+        self._stream_output = hasattr(output, "write")
+        if isinstance(config_file, str):
+            self.config_path = config_file
+        else:
+            self.config_path = getattr(config_file, "name", None)
+        # Built when first accessed through their properties
+        self._parser = None
+        self._errortree = None
+        self._config_tables = None
 
-        self.errortree = ErrorTree(
-            self.metaconf,
-            include_missing=kwargs.get("include_missing", True),
-            include_valid=kwargs.get("include_valid", False),
-        )
-        if not self.errortree.valid:
-            if kwargs.get("logging", False):
-                for line in self.errortree.get_tree.splitlines():
-                    log.log(log.INFO + 3, line)
+        with self.stats.stage("preprocess") as stage:
+            config_lines = preprocess_config(config_file)
+            stage.nodes = len(config_lines)
+        with self.stats.stage("parse") as stage:
+            super().__init__(config_lines, configspec=self.spec.validation_spec)
+            # This is how we access the config options after letting ConfigObj initialize
+            config = self.__dict__["parent"]
+            # Raw values are compared against on reload to find changed sections. Without
+            # track_changes they're only kept from the first reload on, to save memory
+            if kwargs.get("track_changes", True):
+                self.raw_sections = flatten_sections(config)
             else:
-                print(self.errortree.get_tree)
+                self.raw_sections = None
+            if self.stats.enabled:
+                stage.nodes = sum(1 for _ in iter_sections(config))
+
+        with self.stats.stage("validate") as stage:
+            self.result = config.validate(self.spec.validator, preserve_errors=True)
+            if self.stats.enabled:
+                stage.nodes = sum(len(section.scalars) for _, section in iter_sections(config))
+
+        self._check_errors(config_file)
+        if self.render_mode != "eager":
+            return
+        if self.output_format != "text":
+            self._write_option_records()
+            return
+
+        config_tables = self.config_tables
+        with self.stats.stage("render") as stage:
+            stage.nodes = 0
+            for index, table in enumerate(config_tables.iter_tables()):
+                if index == 0:
+                    self.output("")
+                for line in table.splitlines():
+                    self.output(line)
+                stage.nodes += 1
+            if stage.nodes and self._stream_output:
+                self.output("")
+
+    @property
+    def parser(self):
+        """The `ConfigParser` that built `metaconf`."""
+        if self._parser is None:
+            with self.stats.stage("parser") as stage:
+                self._parser = ConfigParser(self.__dict__["parent"], self.spec, self.result)
+                stage.nodes = len(self._parser.metaconf)
+        return self._parser
+
+    @property
+    def metaconf(self):
+        return self.parser.metaconf
+
+    @property
+    def index(self):
+        """Looks up any section or option by dot-notated path with `index.get(path)`."""
+        return self.parser.index
+
+    @property
+    def errortree(self):
+        """The `ErrorTree` of the config.
+
+        When rendering lazily, it's built straight from the validation results and only holds the
+        sections with errors, unless valid options are included. An error budget (`max_errors` or
+        `fail_fast`) cuts either kind of tree short.
+        """
+        if self._errortree is None:
+            sparse = self._sparse_errors() and not self.options.get("include_valid", False)
+            self._errortree = self._build_errortree(sparse)
+        return self._errortree
+
+    def _sparse_errors(self):
+        """Whether errors are found without building metaconf first."""
+        return self.render_mode != "eager" or self.output_format != "text"
+
+    def _build_errortree(self, sparse):
+        from termaconfig.errortree import ErrorTree
+
+        options = {
+            "include_missing": self.options.get("include_missing", True),
+            "max_errors": self.max_errors,
+        }
+        if sparse:
+            with self.stats.stage("errortree") as stage:
+                errortree = ErrorTree.from_results(
+                    self.result, self.spec, config=self.__dict__["parent"], **options
+                )
+                stage.nodes = errortree.error_count
+            return errortree
+
+        metaconf = self.metaconf
+        with self.stats.stage("errortree") as stage:
+            errortree = ErrorTree(
+                metaconf,
+                index=self.index,
+                include_valid=self.options.get("include_valid", False),
+                **options,
+            )
+            stage.nodes = len(metaconf)
+        return errortree
+
+    @property
+    def config_tables(self):
+        """The `ConfigTables` of the config, or None if rendering is set to never."""
+        if self._config_tables is None and self.render_mode != "never":
+            from termaconfig.configtables import ConfigTables
+
+            metaconf = self.metaconf
+            with self.stats.stage("tables") as stage:
+                self._config_tables = ConfigTables(
+                    metaconf,
+                    self.__dict__["parent"],
+                    tabletype=self.options.get("tabletype", None),
+                    spec=self.spec,
+                    index=self.index,
+                )
+                stage.nodes = len(self._config_tables.tabledata)
+        return self._config_tables
+
+    @property
+    def tabledata(self):
+        config_tables = self.config_tables
+        return config_tables.tabledata if config_tables else None
+
+    @classmethod
+    async def aload(cls, config_file, spec_file, **kwargs):
+        """Loads a configuration without blocking the running event loop.
+
+        Reading, validating and rendering all happen in an executor, so any number of loads can
+        be awaited at once. Nothing is printed unless an `output` is passed, and any `output` or
+        `hook` given is called from the executor rather than the event loop.
+
+        Args:
+            config_file (str or file-like object): The configuration.
+            spec_file (str, file-like object or CompiledSpec): The specification.
+            executor (concurrent.futures.Executor, optional): Where to run the load. Defaults to
+                the event loop's default executor.
+            **kwargs: Any other `TermaConfig` options.
+
+        Returns:
+            TermaConfig: The loaded configuration.
+
+        Raises:
+            ConfigValidationError: If the configuration failed validation.
+        """
+        import asyncio
+        import functools
+
+        executor = kwargs.pop("executor", None)
+        kwargs.setdefault("output", None)
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            executor, functools.partial(cls, config_file, spec_file, **kwargs)
+        )
+
+    async def areload(self, config_file=None, executor=None):
+        """Like `reload`, but runs in an executor without blocking the running event loop.
+
+        The config is changed from the executor's thread, and nothing guards against it being
+        used meanwhile. Don't read from it, or start another reload, until this one is awaited.
+        """
+        import asyncio
+
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(executor, self.reload, config_file)
+
+    def reload(self, config_file=None):
+        """Reloads the configuration, only re-validating and rebuilding sections that changed.
+
+        The new config is compared against the current one section by section. Changed sections
+        are validated again and get fresh `metaconf` entries, and their tables are rebuilt along
+        with any that depend on them through `__parent` or `__toggle`. Tables aren't printed again.
+        If stats are enabled, `stats` holds the stages of the reload afterwards.
+
+        If the config was loaded with `track_changes=False`, the raw values to compare against
+        are only kept from the first reload on. That first reload validates every section again
+        and returns None, since there's nothing to tell what changed from.
+
+        Args:
+            config_file (str or file-like object, optional): The new configuration. Defaults to
+                the path the config was originally loaded from.
+
+        Returns:
+            list: Dot-notated paths of the sections whose values changed. None for the first
+                reload without `track_changes`.
+
+        Raises:
+            ConfigValidationError: If the new configuration failed validation.
+        """
+        if config_file is None:
+            if not self.config_path:
+                raise ValueError("No config file to reload from. Please provide one.")
+            config_file = self.config_path
+        config_file, _ = self.validate_files(config_file, self.spec)
+
+        self.stats.reset()
+        config = self.__dict__["parent"]
+        with self.stats.stage("preprocess") as stage:
+            config_lines = preprocess_config(config_file)
+            stage.nodes = len(config_lines)
+        with self.stats.stage("parse") as stage:
+            new_sections = flatten_sections(ConfigObj(config_lines))
+            stage.nodes = len(new_sections)
+        tracked = self.raw_sections is not None
+        if not tracked:
+            changed = list({**{path: None for path, _ in iter_sections(config)}, **new_sections})
+        else:
+            changed = [
+                path
+                for path in {**self.raw_sections, **new_sections}
+                if self.raw_sections.get(path) != new_sections.get(path)
+            ]
+        if not changed:
+            self.raw_sections = new_sections
+            return []
+
+        # Everything changed below is undone if the new config turns out to be invalid, so a
+        # failed reload leaves the config as it was
+        undo = []
+        old_result, old_errortree, old_parser = self.result, self._errortree, self._parser
+        try:
+            rebuilt = self._reload_sections(config, new_sections, changed, undo)
+            self._check_errors(config_file)
+        except BaseException:
+            for action in reversed(undo):
+                action()
+            # A parser built while checking errors was built from the invalid values
+            self.result, self._errortree, self._parser = old_result, old_errortree, old_parser
+            raise
+        self.raw_sections = new_sections
+
+        if self._config_tables is not None:
+            with self.stats.stage("tables") as stage:
+                self._config_tables.update(self.metaconf, config, rebuilt)
+                stage.nodes = len(rebuilt)
+
+        return changed if tracked else None
+
+    def _reload_sections(self, config, new_sections, changed, undo):
+        """Applies the changed sections of a reload and validates them again.
+
+        Functions reverting each change are added to `undo`. `self.result` is only ever replaced,
+        never changed in place.
+
+        Returns:
+            list: Paths of the spec sections that need their metaconf and tables rebuilt.
+        """
+        with self.stats.stage("validate") as stage:
+            stage.nodes = 0
+            updated = []
+            for path in changed:
+                keys = path.split(".") if path else []
+                if path not in new_sections:
+                    # Removed sections only stay if the spec has them, like on a fresh load
+                    try:
+                        parent = get_nested_value(config, keys[:-1])
+                    except KeyError:
+                        continue  # Already removed along with its parent
+                    if keys[-1] in parent.sections and parent[keys[-1]].configspec is None:
+                        undo.append(_section_remover(parent, keys[-1]))
+                        continue
+
+                section = config
+                for key in keys:
+                    if key not in section:
+                        section[key] = {}
+                        undo.append(functools.partial(section.__delitem__, key))
+                    section = section[key]
+
+                # Values are set again from scratch, so they end up in the new file's order
+                new_values = new_sections.get(path, {})
+                undo.append(_scalars_restorer(section))
+                for key in list(section.scalars):
+                    del section[key]
+                for key, value in new_values.items():
+                    section[key] = value
+                stage.nodes += len(new_values)
+                updated.append((keys, section))
+
+            # Validating a section also validates its subsections, so those are skipped
+            changed_paths = set(changed)
+            for keys, section in updated:
+                # Sections that aren't in the spec have no results
+                if section.configspec is None or any(
+                    ".".join(keys[:depth]) in changed_paths for depth in range(len(keys))
+                ):
+                    continue
+                self._set_result(
+                    keys,
+                    config.validate(self.spec.validator, preserve_errors=True, section=section),
+                )
+
+        # Changes in sections unknown to the spec still affect their closest spec section
+        rebuilt = []
+        for path in changed:
+            keys = path.split(".") if path else []
+            while keys and ".".join(keys) not in self.spec.sections:
+                keys.pop()
+            if keys and ".".join(keys) not in rebuilt:
+                rebuilt.append(".".join(keys))
+
+        # Anything not built yet is built from the updated config when it's first accessed
+        if self._parser is not None:
+            undo.append(_metaconf_restorer(self._parser, rebuilt))
+            with self.stats.stage("parser") as stage:
+                self._parser.update(config, self.result, rebuilt)
+                stage.nodes = len(rebuilt)
+        return rebuilt
+
+    def _set_result(self, keys, result):
+        """Replaces the validation results for a section, expanding squashed parent results.
+
+        Dicts along the path are copied rather than changed, so the old results stay intact.
+        """
+        if not keys:
+            self.result = result
+            return
+        root = dict(self.result) if isinstance(self.result, dict) else {}
+        parent = root
+        for key in keys[:-1]:
+            child = parent.get(key, None)
+            parent[key] = dict(child) if isinstance(child, dict) else {}
+            parent = parent[key]
+        parent[keys[-1]] = result
+        self.result = root
+
+    def _check_errors(self, config_file):
+        """Builds the error tree, reporting it and raising if the config isn't valid."""
+        self._errortree = None
+        if self.output_format != "text":
+            self._check_error_records(config_file)
+            return
+        if not self._sparse_errors() or not self.options.get("include_valid", False):
+            errortree = self.errortree
+        else:
+            # A tree with valid options needs metaconf, which isn't needed to find errors
+            errortree = self._build_errortree(sparse=True)
+        if not errortree.valid:
+            for line in errortree.iter_tree_lines():
+                self.output(line)
 
             raise ConfigValidationError(f"The configuration at {config_file} failed validation")
 
-        config_tables = ConfigTables(self.metaconf, config, tabletype=kwargs.get("tabletype", None))
-        self.tabledata = config_tables.tabledata
+    def _check_error_records(self, config_file):
+        """Writes an error record per failing option and raises if there were any.
 
-        if config_tables.all_tables:
-            if kwargs.get("logging", False):
-                log.log(log.INFO + 3, "")
-                for line in config_tables.all_tables.splitlines():
-                    log.log(log.INFO + 3, line)
-            else:
-                print()
-                print(config_tables.all_tables)
+        Errors are found straight from the validation results, without building an error tree.
+        """
+        from termaconfig.structured import iter_error_records, write_records
+
+        with self.stats.stage("errortree") as stage:
+            records = iter_error_records(
+                self.result,
+                self.spec,
+                config=self.__dict__["parent"],
+                include_missing=self.options.get("include_missing", True),
+            )
+            if self.max_errors is not None:
+                records = itertools.islice(records, self.max_errors)
+            first = next(records, None)
+            if first is None:
+                stage.nodes = 0
+                return
+            stage.nodes = write_records(
+                itertools.chain([first], records), self.output, self.output_format
+            )
+        raise ConfigValidationError(f"The configuration at {config_file} failed validation")
+
+    def _write_option_records(self):
+        """Writes a record per option of metaconf, in place of rendering tables."""
+        from termaconfig.structured import iter_option_records, write_records
+
+        metaconf = self.metaconf
+        with self.stats.stage("render") as stage:
+            stage.nodes = write_records(
+                iter_option_records(metaconf), self.output, self.output_format
+            )
 
     def validate_files(self, config_file, spec_file):
+        """Checks that the config and spec are readable paths or open text files.
+
+        Paths are returned as they are, so they're only opened when read, and closed right after.
+        """
         if isinstance(config_file, str):
             try:
-                config_file = open(config_file, "r")
+                with open(config_file, "r"):
+                    pass
             except FileNotFoundError:
                 raise FileNotFoundError(f"Config file not found: {config_file}")
             except PermissionError:
-                raise PermissionError(f"Failed opening config file: {spec_file}")
+                raise PermissionError(f"Failed opening config file: {config_file}")
         if isinstance(spec_file, str):
             try:
-                spec_file = open(spec_file, "r")
+                with open(spec_file, "r"):
+                    pass
             except FileNotFoundError:
                 raise FileNotFoundError(f"Specification file not found: {spec_file}")
             except PermissionError:
                 raise PermissionError(f"Failed opening specification file: {spec_file}")
 
-        if not isinstance(config_file, io.TextIOBase):
+        if not isinstance(config_file, (str, io.TextIOBase)):
             raise TypeError(
                 f"Input config is neither a filepath nor filedata object: {config_file}"
             )
-        if not isinstance(spec_file, io.TextIOBase):
+        if not isinstance(spec_file, (str, io.TextIOBase, CompiledSpec)):
             raise TypeError(
                 f"Input specification is neither a filepath nor filedata object: {spec_file}"
             )
@@ -0,0 +1,144 @@
+# termaconfig/batch.py
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from configobj import ConfigObj
+
+from termaconfig.configtables import ConfigTables
+from termaconfig.errortree import ErrorTree
+from termaconfig.parser import ConfigParser
+from termaconfig.spec import CompiledSpec
+from termaconfig.utils import preprocess_config
+
+# The spec and options each worker process validates with, set up once per process
+_worker_state = {}
+
+
+class FileResult:
+    """The outcome of validating one config file with `validate_many`.
+
+    Attributes:
+        path (str): The config file path.
+        valid (bool): Whether the config passed validation.
+        errors (dict): Error messages of invalid options by dot-notated path. Options missing
+            from the config are included as "missing" unless `include_missing` is False.
+        error_tree (str): The rendered error tree, if rendering was enabled and errors were found.
+        tables (str): All rendered tables, if rendering was enabled and the config was valid.
+        exception (str): Why the file couldn't be validated at all (eg it couldn't be read or
+            parsed), otherwise None.
+    """
+
+    __slots__ = ("error_tree", "errors", "exception", "path", "tables", "valid")
+
+    def __init__(self, path, **kwargs):
+        self.path = path
+        self.valid = kwargs.get("valid", False)
+        self.errors = kwargs.get("errors", {})
+        self.error_tree = kwargs.get("error_tree", None)
+        self.tables = kwargs.get("tables", None)
+        self.exception = kwargs.get("exception", None)
+
+    def __repr__(self):
+        return f"FileResult({self.path!r}, valid={self.valid}, errors={len(self.errors)})"
+
+
+def validate_many(paths, spec, **kwargs):
+    """Validates many config files against one spec, spread over a pool of processes.
+
+    The spec is compiled once up front, then handed to each worker process so it's only set up
+    once per process. Nothing is printed; every file gets a `FileResult` instead.
+
+    Args:
+        paths (list): Paths of the config files to validate.
+        spec (str, file-like object, dict or CompiledSpec): The specification.
+        workers (int, optional): Number of worker processes. Defaults to the number of CPUs.
+            With 1, files are validated in this process without a pool.
+        render (bool, optional): Whether to render error trees and tables into the results.
+            False by default, which skips building tables entirely.
+        tabletype (class, optional): terminaltables3 class used when rendering tables.
+        include_missing (bool, optional): Whether missing options count as errors. True by
+            default, like in `TermaConfig`.
+        delimiter (str, optional): The metakey delimiter, if the spec isn't compiled yet.
+
+    Returns:
+        list: A `FileResult` per path, in the same order as `paths`.
+    """
+    paths = list(paths)
+    if not isinstance(spec, CompiledSpec):
+        spec = CompiledSpec(spec, delimiter=kwargs.get("delimiter", "__"))
+    options = {
+        "render": kwargs.get("render", False),
+        "tabletype": kwargs.get("tabletype", None),
+        "include_missing": kwargs.get("include_missing", True),
+    }
+
+    workers = kwargs.get("workers", None) or os.cpu_count() or 1
+    workers = min(workers, len(paths))
+    if workers <= 1:
+        _init_worker(spec, options)
+        try:
+            return [_validate_file(path) for path in paths]
+        finally:
+            _worker_state.clear()
+
+    # The spec is sent as a plain dict, which workers compile without parsing any text again
+    initargs = (spec.configspec.dict(), options, spec.delimiter)
+    # Enough chunks per worker to keep them all busy when some files take longer than others
+    chunksize = max(1, len(paths) // (workers * 4))
+    with ProcessPoolExecutor(workers, initializer=_init_worker, initargs=initargs) as executor:
+        return list(executor.map(_validate_file, paths, chunksize=chunksize))
+
+
+def _init_worker(spec, options, delimiter="__"):
+    if not isinstance(spec, CompiledSpec):
+        spec = CompiledSpec(spec, delimiter=delimiter)
+    _worker_state["spec"] = spec
+    _worker_state["options"] = options
+
+
+def _validate_file(path):
+    """Validates a single config file with the spec set up for this process."""
+    spec = _worker_state["spec"]
+    options = _worker_state["options"]
+    try:
+        config = ConfigObj(preprocess_config(path), configspec=spec.validation_spec)
+    except Exception as e:
+        return FileResult(path, exception=f"{type(e).__name__}: {e}")
+
+    vtd_result = config.validate(spec.validator, preserve_errors=True)
+    if not options["render"]:
+        # Errors come straight from the validation results, without parsing a metaconf
+        errors = {}
+        for section_path, key, error in spec.iter_failures(vtd_result, config):
+            if error is not False:
+                errors[f"{section_path}.{key}"] = str(error)
+            elif options["include_missing"]:
+                errors[f"{section_path}.{key}"] = "missing"
+        return FileResult(path, valid=not errors, errors=errors)
+
+    parser = ConfigParser(config, spec, vtd_result)
+    errortree = ErrorTree(
+        parser.metaconf, index=parser.index, include_missing=options["include_missing"]
+    )
+
+    errors = {}
+    for section_path, section in parser.metaconf.items():
+        for key, data in section["data"].items():
+            if data["error"]:
+                errors[f"{section_path}.{key}"] = data["error"]
+            elif data["missing"] and options["include_missing"]:
+                errors[f"{section_path}.{key}"] = "missing"
+
+    result = FileResult(path, valid=errortree.valid, errors=errors)
+    if not errortree.valid:
+        result.error_tree = errortree.get_tree
+    else:
+        result.tables = ConfigTables(
+            parser.metaconf,
+            config,
+            tabletype=options["tabletype"],
+            spec=spec,
+            index=parser.index,
+        ).all_tables
+    return result
@@ -1,13 +1,59 @@
 # termaconfig/configtables.py
 
+import itertools
 import logging as log
-from copy import deepcopy
+from collections import ChainMap
 
 import terminaltables3 as tt3
 
-import termaconfig as tc
 import termaconfig.utils as util
 from termaconfig.exceptions import TableTypeError
+from termaconfig.graph import SectionGraph
+from termaconfig.index import PathIndex
+from termaconfig.records import REQUIRED_PARAM_KEYS
+
+
+class TableEntry(ChainMap):
+    """A tabledata entry layered over its metaconf section.
+
+    Anything set on the entry is kept in the entry itself and the metaconf section underneath is
+    never changed, so sections only cost new objects for what table processing actually changes.
+    The section's 'data' dict is shared until it needs changing (see `own_data`).
+
+    The 'tablestr' is rendered the first time it's looked up.
+    """
+
+    def __init__(self, details, tables, entry):
+        super().__init__({}, details)
+        self._tables = tables
+        self._entry = entry
+
+    def own_data(self):
+        """Returns the entry's 'data' dict, copying it first if it's still the metaconf's."""
+        if "data" not in self.maps[0]:
+            self.maps[0]["data"] = dict(self.maps[1]["data"])
+        return self.maps[0]["data"]
+
+    def __missing__(self, key):
+        if key == "tablestr":
+            return self._tables.render(self._entry)
+        raise KeyError(key)
+
+    def get(self, key, default=None):
+        if key in self or key == "tablestr":
+            return self[key]
+        return default
+
+    def copy(self):
+        entry = TableEntry(self.maps[1], self._tables, self._entry)
+        entry.maps[0].update(self.maps[0])
+        return entry
+
+    __copy__ = copy
+
+    def __reduce__(self):
+        # Copies and pickles become plain dicts with the table string included
+        return (dict, (dict(self, tablestr=self["tablestr"]),))
 
 
 class ConfigTables:
@@ -22,11 +68,6 @@ class ConfigTables:
     """
 
     def __init__(self, metaconf, config, **kwargs):
-        # I ended up realizing that tabledata is actually iterating upon the
-        # same object pointer as metaconf, which is bad.
-        # Instead of refactoring logic again, deepcopy becomes a saving grace here
-        tabledata = deepcopy(metaconf)
-
         # Verify input terminaltables class
         self.tabletype = kwargs.get("tabletype", None)
         if self.tabletype:
@@ -35,76 +76,263 @@ class ConfigTables:
         else:
             self.tabletype = tt3.SingleTable
 
-        self.delimiter = kwargs.get("delimiter", "__")
+        # A CompiledSpec provides the delimiter and pre-parsed metakeys
+        self.spec = kwargs.get("spec", None)
+        if self.spec:
+            self.delimiter = self.spec.delimiter
+        else:
+            self.delimiter = kwargs.get("delimiter", "__")
 
         self.config = config
+        # Used to resolve __toggle paths. Built from metaconf if the parser's index isn't passed in
+        self.index = kwargs.get("index", None) or PathIndex(metaconf)
+        # Merge order and dependencies of sections. Kept with the spec, if there is one
+        self.graph = self.spec.section_graph if self.spec else SectionGraph(metaconf)
+
+        # Rendered table strings along with what they were rendered from
+        self._rendered = {}
+        # Pages to show in place of a section's __page, only set while rendering a page
+        self._pages = {}
+        self.tabledata = self._build_tables(metaconf, config)
+
+    def update(self, metaconf, config, sections):
+        """Rebuilds the tables for the given sections after their metaconf entries changed.
+
+        Tables that are merged with, or toggled by, any of the sections are rebuilt as well,
+        so the result is the same as creating a new ConfigTables. Everything else is kept.
+
+        Args:
+            metaconf (dict): The updated metaconf.
+            config (dict): The updated config.
+            sections (list): Dot-notated paths of the sections that changed.
+        """
+        for entry in sections:
+            self.index.add_section(entry, metaconf[entry])
+        affected = self.graph.related(sections)
+        rebuilt = self._build_tables(
+            {entry: details for entry, details in metaconf.items() if entry in affected}, config
+        )
+
+        tabledata = {}
+        for entry in metaconf:
+            if entry in affected:
+                if entry in rebuilt:
+                    tabledata[entry] = rebuilt[entry]
+            elif entry in self.tabledata:
+                tabledata[entry] = self.tabledata[entry]
+
+        self.config = config
+        self.tabledata = tabledata
+        for entry in list(self._rendered):
+            if entry not in tabledata:
+                del self._rendered[entry]
+        return tabledata
+
+    def _build_tables(self, metaconf, config):
+        """Runs every table processing step over a metaconf, returning the new tabledata."""
+        self._config_sections = {}
+        # Entries are layered over metaconf so processing never changes the parser's output,
+        # without having to copy all of it up front
+        tabledata = {entry: TableEntry(details, self, entry) for entry, details in metaconf.items()}
 
         tabledata = self._process_table_sections(tabledata, config)
         tabledata = self._create_table_rows(tabledata)
-        tabledata = self._process_table_strings(tabledata, self.tabletype)
 
-        self.tabledata = tabledata
+        return tabledata
 
     @property
     def all_tables(self):
         """Returns a string containing all tables created from configspec parameters.
 
-        This property iterates through each entry in tabledata, checks if it contains a 'tablestr' key,
-        and if so, creates a table instance using the passed terminaltables3 class. It then formats
-        the table based on the presence of 'title', 'header', and other details before appending
-        it to a string.
+        This property joins every table from `iter_tables`, each followed by a newline. For large
+        configs, prefer iterating over `iter_tables` directly.
 
         Returns:
             str or None: A long multi-line string containing all the table strings from tabledata[entries]['tablestr'] if any, otherwise None.
         """
-        alltables = ""
-        log.debug("Converting tabledata to table lines")
-        for entry, details in self.tabledata.items():
-            if details["tablestr"]:
-                alltables += details["tablestr"] + "\n"
+        alltables = "".join(f"{table}\n" for table in self.iter_tables())
         if alltables != "":
             return alltables
         else:
             return None
 
-    def _process_table_strings(self, tabledata, tabletype):
-        """Creates table representations of the processed config table data using terminaltables3
+    def iter_tables(self):
+        """Yields each table string in order, rendering them one at a time.
+
+        Yields:
+            str: The table string of a section that has something to show.
+        """
+        log.debug("Converting tabledata to table lines")
+        for entry in self.tabledata:
+            table = self.render(entry)
+            if table:
+                yield table
+
+    def render(self, entry):
+        """Returns the table string for a single section, rendering it only if needed.
+
+        Rendered strings are kept until the section's title, header or rows change, so repeated
+        calls (and `tabledata[entry]["tablestr"]` lookups) only render once.
 
-        This property iterates through each entry in tabledata, checks if it contains a 'table' key,
-        and if so, creates a SingleTable instance using terminaltables3. It then formats the table
-        based on the presence of 'title', 'header', and other details before appending it to a string.
+        Args:
+            entry (str): Dot-notated path of the section.
 
         Returns:
-            dict: The input dict with a 'SingleTable' str in each entry.
+            str or None: The table string, or None if the section has nothing to show.
+
+        Raises:
+            KeyError: If the section has no tabledata (it doesn't exist or was merged into a parent).
         """
-        log.debug("Converting table row lists to strings")
-        for entry, details in tabledata.items():
-            if not details["tablerows"]:
-                tabledata[entry]["tablestr"] = None
-                continue
-            try:
-                table_instance = tabletype(details.get("tablerows", []))
-            except TypeError as e:
-                raise TypeError(f"{e}. Was a correct terminaltables class passed?")
-
-            # Header row would have already been handled if present
-            if not details["header"]:
-                table_instance.inner_heading_row_border = False
-            if details["title"]:
-                table_instance.title = details["title"]
-            tabledata[entry]["tablestr"] = table_instance.table
-        return tabledata
+        if entry not in self.tabledata:
+            raise KeyError(f"No tabledata for section: {entry}")
+        details = self.tabledata[entry]
+        if not details["tablerows"]:
+            return None
+
+        signature = (
+            self.tabletype,
+            details["title"],
+            bool(details["header"]),
+            tuple(tuple(row) for row in details["tablerows"]),
+        )
+        if entry in self._rendered and self._rendered[entry][0] == signature:
+            return self._rendered[entry][1]
+
+        log.debug(f"Rendering table for {entry}")
+        self._rendered[entry] = (signature, self._render_table(details))
+        return self._rendered[entry][1]
+
+    def render_page(self, entry, page):
+        """Returns the table showing a given page of entries of a `__type` section.
+
+        Only works for sections with `__limit` set. The table is built from scratch with the page
+        in place of `__page`, along with any tables merged with it through `__parent`, without
+        changing `tabledata`.
+
+        Args:
+            entry (str): Dot-notated path of the section.
+            page (int): The page to show, starting from 1.
+
+        Returns:
+            str or None: The table string holding the section (that of its parent if it's merged
+                into one), or None if it has nothing to show.
+
+        Raises:
+            KeyError: If the section doesn't exist.
+            ValueError: If the section has no `__limit`.
+        """
+        metaconf = self.index.sections
+        if entry not in metaconf:
+            raise KeyError(f"No metaconf for section: {entry}")
+        if not metaconf[entry]["limit"]:
+            raise ValueError(f"Section {entry} has no {self.delimiter}limit to show pages of")
+
+        affected = self.graph.related([entry])
+        self._pages = {entry: page}
+        try:
+            tabledata = self._build_tables(
+                {entry: details for entry, details in metaconf.items() if entry in affected},
+                self.config,
+            )
+        finally:
+            self._pages = {}
+
+        # Sections merged into a parent are shown in the parent's table
+        table_entry = entry
+        while table_entry not in tabledata and metaconf[table_entry]["parent"] in metaconf:
+            table_entry = metaconf[table_entry]["parent"]
+        if table_entry not in tabledata or not tabledata[table_entry]["tablerows"]:
+            return None
+        return self._render_table(tabledata[table_entry])
+
+    def _render_table(self, details):
+        """Renders a tabledata entry's rows into a table string."""
+        try:
+            table_instance = self.tabletype(details["tablerows"])
+        except TypeError as e:
+            raise TypeError(f"{e}. Was a correct terminaltables class passed?")
+
+        # Header row would have already been handled if present
+        if not details["header"]:
+            table_instance.inner_heading_row_border = False
+        if details["title"]:
+            table_instance.title = details["title"]
+
+        return table_instance.table
+
+    def _find_config_section(self, entry, config):
+        """Finds a config section by its dot-notated path.
+
+        Sections that were found before are remembered, so each lookup only takes one step
+        from an already known parent section.
+        """
+        if entry in self._config_sections:
+            return self._config_sections[entry]
+
+        parent_path, _, key = entry.rpartition(".")
+        parent = self._find_config_section(parent_path, config) if parent_path else config
+        if isinstance(parent, dict) and key in parent:
+            section = parent[key]
+        else:
+            section = None
+        self._config_sections[entry] = section
+        return section
 
     def _get_config_section(self, entry, details, config):
-        keys = entry.split(".")
-        value_from_config = util.get_nested_value(config, keys)
+        """Replaces the section's data with the entries of its config section.
+
+        With `__limit` set, only the entries on the shown page are collected, so the cost depends
+        on the page size rather than on the size of the section. How many entries come after the
+        page is kept in `details["more"]`.
+        """
+        value_from_config = self._find_config_section(entry, config)
         if not isinstance(value_from_config, dict):
             return details
-        for key, value in value_from_config.items():
-            details["data"][key] = {}
-            details["data"][key]["value"] = value
+        limit, page = self._get_page(entry, details)
+        if limit is None:
+            details["data"] = {
+                **details["data"],
+                **{key: {"value": value} for key, value in value_from_config.items()},
+            }
+            return details
+
+        spec_data = details["data"]
+        total = len(value_from_config) + sum(1 for key in spec_data if key not in value_from_config)
+        start = (page - 1) * limit
+        # Only keys are iterated, since looking values up in a ConfigObj section costs more
+        if spec_data:
+            # Same entries, in the same order, as merging the spec data with the config section
+            keys = itertools.chain(
+                spec_data, (key for key in value_from_config if key not in spec_data)
+            )
+        else:
+            keys = iter(value_from_config)
+        details["data"] = {
+            key: {"value": value_from_config[key]} if key in value_from_config else spec_data[key]
+            for key in itertools.islice(keys, start, start + limit)
+        }
+        details["more"] = max(total - start - limit, 0)
         return details
 
+    def _get_page(self, entry, details):
+        """Returns the `__limit` and page number of a section. The limit is None if not set."""
+        if not details["limit"]:
+            return None, 1
+        page = self._pages.get(entry, details["page"])
+        if page is None:
+            page = 1
+        try:
+            limit, page = int(details["limit"]), int(page)
+        except ValueError as e:
+            raise ValueError(
+                f"{e}. Are {self.delimiter}limit and {self.delimiter}page in {entry} integers?"
+            )
+        if limit < 1 or page < 1:
+            raise ValueError(
+                f"{self.delimiter}limit and {self.delimiter}page in {entry} should be at least 1."
+            )
+        return limit, page
+
     def _handle_type(self, tabledata, entry, details, config):
         """__type is a multi-option setting for controlling how to display all entries in the section."""
         details = (
@@ -126,9 +354,16 @@ class ConfigTables:
             except ValueError as e:
                 raise ValueError(f"{e}. Is {self.delimiter}wrap in {entry} an integer?")
 
+        # Entries left out by __limit are summed up after the shown ones
+        more = f"… and {details['more']} more" if details.get("more") else None
+
         tabledata[entry]["data"] = {}
         if details["type"] == "variable":
             tabledata[entry]["data"] = details["data"]
+            if more:
+                tabledata[entry]["data"][f"{entry}{self.delimiter}more"] = util.fill_required_keys(
+                    {"title": more, "value": ""}, REQUIRED_PARAM_KEYS
+                )
             return tabledata
         elif details["type"] == "list_values":
             values = [
@@ -161,8 +396,10 @@ class ConfigTables:
         else:
             raise ValueError(f"The specified type '{details['type']}' for '{entry}' is not valid.")
 
+        if more:
+            tabledata[entry]["data"][entry]["value"] += f"\n{more}"
         tabledata[entry]["data"][entry] = util.fill_required_keys(
-            tabledata[entry]["data"][entry], tc.REQUIRED_PARAM_KEYS
+            tabledata[entry]["data"][entry], REQUIRED_PARAM_KEYS
         )
         # Return section entries to None, so no nasty double lines occur
         tabledata[entry]["title"] = None
@@ -180,12 +417,15 @@ class ConfigTables:
             return tabledata
 
         header_value = details["header"]
-        try:
-            header_list = [util.sanitize_str(item.strip()) for item in header_value.split(",")]
-            log.debug(f"Found a valid header list: {header_list}")
-        except Exception as e:
-            log.error(f"Failed to parse header value for {entry}: {e}")
-            header_list = []
+        if self.spec and entry in self.spec.headers:
+            header_list = self.spec.headers[entry]
+        else:
+            try:
+                header_list = util.parse_header(header_value)
+                log.debug(f"Found a valid header list: {header_list}")
+            except Exception as e:
+                log.error(f"Failed to parse header value for {entry}: {e}")
+                header_list = []
 
         if len(header_list) > 0:
             header_dict = {
@@ -195,7 +435,7 @@ class ConfigTables:
                 }
             }
             header_dict["__header__"] = util.fill_required_keys(
-                header_dict["__header__"], tc.REQUIRED_PARAM_KEYS
+                header_dict["__header__"], REQUIRED_PARAM_KEYS
             )
             if len(header_list) > 2:
                 header_dict["__header__"]["note"] = header_list[2]
@@ -205,27 +445,33 @@ class ConfigTables:
 
     def _handle_parent(self, tabledata, entry, details):
         # __parent: Table merging logic.
-        # Should be the last thing processed so we're not trying to access a deleted dict
+        # Runs after every section was handled on its own, children before their parents
         if details["parent"]:
             parent_section = details["parent"]
             if parent_section in tabledata:
+                parent_data = tabledata[parent_section].own_data()
                 if details["spacer"]:
-                    spacer = util.fill_required_keys({}, tc.REQUIRED_PARAM_KEYS)
-                    tabledata[parent_section]["data"][f"{entry}{self.delimiter}spacer"] = spacer
+                    spacer = util.fill_required_keys({}, REQUIRED_PARAM_KEYS)
+                    parent_data[f"{entry}{self.delimiter}spacer"] = spacer
                 if details["title"]:
                     title = {"value": "", "title": details["title"]}
-                    title = util.fill_required_keys(title, tc.REQUIRED_PARAM_KEYS)
-                    tabledata[parent_section]["data"][f"{entry}{self.delimiter}title"] = title
+                    title = util.fill_required_keys(title, REQUIRED_PARAM_KEYS)
+                    parent_data[f"{entry}{self.delimiter}title"] = title
 
-                tabledata[parent_section]["data"].update(details["data"])
+                parent_data.update(details["data"])
                 del tabledata[entry]
             else:
                 raise ValueError(f"Parent setting: {parent_section} not found for option: {entry}")
         return tabledata
 
     def _process_table_sections(self, tabledata, config):
-        """Master function handling all the options set for config sections"""
-        for entry, details in list(tabledata.items()):
+        """Master function handling all the options set for config sections.
+
+        Each section is handled on its own first. Tables are then merged into their `__parent`
+        in the order of the section graph, so chains of parents come out the same whatever order
+        they're in.
+        """
+        for entry, details in tabledata.items():
             try:
                 # __ignore: We set the str value to a proper bool here, if it wasn't already.
                 if str(tabledata[entry]["ignore"]).lower() == "true":
@@ -235,25 +481,25 @@ class ConfigTables:
                     tabledata[entry]["ignore"] = False
 
                 # __toggle should be taken as a full dot-notated path to another config option.
+                # It's looked up in metaconf, so it doesn't matter how the target table was handled
                 if details["toggle"]:
-                    toggle_parts = details["toggle"].split(".")
-                    section_path = ".".join(toggle_parts[:-1])
-                    setting_key = toggle_parts[-1]
-                    # Since we can't just have
-                    if section_path in tabledata and setting_key in tabledata[section_path]["data"]:
-                        # The config parser should have already set up datatypes, but str is checked to be safe.
-                        if (
-                            str(tabledata[section_path]["data"][setting_key]["value"]).lower()
-                            == "false"
-                        ):
-                            tabledata[entry]["ignore"] = True
-                            continue
+                    try:
+                        toggle_value = self.index.get(details["toggle"])["value"]
+                    except KeyError:
+                        toggle_value = None
+                    # The config parser should have already set up datatypes, but str is checked to be safe.
+                    if str(toggle_value).lower() == "false":
+                        tabledata[entry]["ignore"] = True
+                        continue
 
                 tabledata = self._handle_type(tabledata, entry, details, config)
                 tabledata = self._handle_header(tabledata, entry, details)
-                tabledata = self._handle_parent(tabledata, entry, details)
             except Exception:
                 raise
+
+        for entry in self.graph.order:
+            if entry in tabledata and not tabledata[entry]["ignore"]:
+                tabledata = self._handle_parent(tabledata, entry, tabledata[entry])
         return tabledata
 
     def _create_table_rows(self, tabledata):
@@ -267,22 +513,24 @@ class ConfigTables:
                     continue
 
                 keys_to_remove = []
+                # Entries of __type = variable sections come straight from the config, without
+                # any metakeys
                 for key, data in tabledata[entry]["data"].items():
-                    if data["ignore"]:
+                    if data.get("ignore"):
                         keys_to_remove.append(key)
                 for key in keys_to_remove:
-                    del tabledata[entry]["data"][key]
+                    del tabledata[entry].own_data()[key]
                 # Add the table row data
                 for key, data in tabledata[entry]["data"].items():
                     # The value entry check *should* be redundant
                     if "value" not in tabledata[entry]["data"][key]:
                         continue
-                    if data["title"]:
+                    if data.get("title"):
                         table_row = [tabledata[entry]["data"][key]["title"], data["value"]]
                     else:
                         table_row = [key, data["value"]]
 
-                    if data["note"]:
+                    if data.get("note"):
                         table_row.append(data["note"])
 
                     tabledata[entry]["tablerows"].append(table_row)
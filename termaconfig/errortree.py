@@ -1,15 +1,86 @@
 # termaconfig/errortree.py
 
-from printree import ftree
+from collections.abc import Mapping
 
-from termaconfig.utils import split_dot_notated_keys
+from termaconfig.index import PathIndex
+from termaconfig.treeprint import iter_tree_lines
+from termaconfig.utils import error_budget
 
 
 class ErrorTree:
-    """Takes config, spec and pre-processed error results to make easily readable error trees."""
+    """Takes config, spec and pre-processed error results to make easily readable error trees.
+
+    Built from a metaconf, the tree has a branch for every section. `ErrorTree.from_results`
+    builds a sparse tree straight from validation results instead, holding only the branches
+    that lead to errors.
+
+    With `max_errors` (or `fail_fast`, the same as `max_errors=1`), the tree stops growing once
+    that many errors were found. If anything was left unchecked, `truncated` is set and the tree
+    ends with a note of how many sections weren't checked (also kept in `unchecked_sections`).
+    """
 
     def __init__(self, metaconf, **kwargs):
+        self._set_options(kwargs)
+        self.metaconf = metaconf
+        # Section parent/child links. Built from metaconf if the parser's index isn't passed in
+        self.index = kwargs.get("index", None) or PathIndex(metaconf)
+        # Set to false if any errors show up
+        self.valid = True
+        self.build_tree()
+
+    @classmethod
+    def from_results(cls, vtd_result, spec, **kwargs):
+        """Builds a tree only from the options that failed validation.
+
+        The validation results are walked with `CompiledSpec.iter_failures`, and the details
+        of each failing option come straight from the compiled spec, so no metaconf is needed.
+        Only sections with errors get a branch. Valid options can't be included.
+
+        Args:
+            vtd_result (dict or bool): Results of ConfigObj's `validate(preserve_errors=True)`.
+            spec (CompiledSpec): The spec the config was validated with.
+            config (dict, optional): The validated config, to find missing options that only
+                have metakeys in the spec.
+            include_missing (bool, optional): Whether to include missing options. True by default.
+
+        Returns:
+            ErrorTree: A tree without `metaconf` or `index`.
+
+        Raises:
+            ValueError: If `include_valid` is set.
+        """
+        errortree = cls.__new__(cls)
+        errortree._set_options(kwargs)
+        if errortree.include_valid:
+            raise ValueError("Trees built from validation results can't include valid options")
+        errortree.metaconf = None
+        errortree.index = None
+        errortree.valid = True
+        errortree.tree = {}
+
+        for path, key, result in spec.iter_failures(vtd_result, kwargs.get("config", None)):
+            if result is False and not errortree.include_missing:
+                continue
+            if errortree._budget_spent():
+                errortree._truncate(len(spec.sections) - spec.sections[path]["position"] - 1)
+                break
+            compiled = spec.sections[path]
+            tree_sec = errortree.tree
+            for section_key in compiled["keys"]:
+                tree_sec = tree_sec.setdefault(section_key, {})
+            error = None if result is False else str(result)
+            errortree._add_option(tree_sec, key, compiled["params"][key], result is False, error)
+        return errortree
+
+    def _set_options(self, kwargs):
         self.delimiter = kwargs.get("delimiter", "__")
+        self.max_errors = error_budget(
+            kwargs.get("max_errors", None), kwargs.get("fail_fast", False)
+        )
+        # How many errors (and missing options, if included) are in the tree
+        self.error_count = 0
+        self.truncated = False
+        self.unchecked_sections = 0
 
         self.include_missing = kwargs.get("include_missing", True)
         self.include_valid = kwargs.get("include_valid", False)
@@ -20,62 +91,104 @@ class ErrorTree:
         if not isinstance(self.include_valid, bool):
             raise TypeError(f"Expected include_valid to be a boolean, got: {self.include_valid}")
 
-        self.metaconf = metaconf
-        # Set to false if any errors show up
-        self.valid = True
-        self.build_tree()
-
     @property
     def get_tree(self) -> str:
         """
         Generates a tree-like string representation of any configuration errors.
 
         Returns:
-            str: A visual representation of self.tree using printree.
+            str: A visual representation of self.tree, in the same format as printree.
+        """
+        return "\n".join(self.iter_tree_lines())
+
+    def iter_tree_lines(self):
+        """Yields the lines of the tree representation one at a time.
+
+        Useful for writing large trees out without building the whole string first.
+
+        Yields:
+            str: A single line of the tree, without a trailing newline.
         """
-        return ftree(self.tree)
+        yield from iter_tree_lines(self.tree)
 
     def build_tree(self):
-        """Traverses the metaconf and constructs a self.tree dict for use with tree-printing utilities."""
+        """Goes over the metaconf once and constructs a self.tree dict for use with tree-printing utilities.
+
+        Sections are nested under their parent's branch using the index's child links, after the
+        parent's own options, which looks cleaner. Every metaconf entry is only visited once.
+        """
         if not hasattr(self, "metaconf"):
             raise AttributeError("metaconf attribute is required before calling this method.")
 
-        metaconf = split_dot_notated_keys(self.metaconf, "children")
         self.tree = {}
+        checked = 0
+
+        def traverse_section(section_path, tree_sec):
+            nonlocal checked
+            section_data = self.index.sections.get(section_path, None)
+            if isinstance(section_data, Mapping) and "data" in section_data:
+                checked += 1
+                self._add_options(section_data["data"], tree_sec)
+
+            # Child sections processed after options, which looks cleaner
+            for child_path in self.index.children[section_path]:
+                if self._budget_spent():
+                    self.truncated = True
+                    return
+                child_tree = tree_sec[child_path.rpartition(".")[2]] = {}
+                traverse_section(child_path, child_tree)
+
+        traverse_section("", self.tree)
+        if self.truncated:
+            self._truncate(len(self.index.sections) - checked)
+
+    def _add_options(self, data, tree_sec):
+        """Adds the errors (and if included, missing and valid entries) of a section's options."""
+        for conf_key, conf_data in data.items():
+            if self._budget_spent():
+                self.truncated = True
+                return
+            self._add_option(
+                tree_sec, conf_key, conf_data, conf_data["missing"], conf_data.get("error")
+            )
+
+    def _budget_spent(self):
+        return self.max_errors is not None and self.error_count >= self.max_errors
+
+    def _truncate(self, unchecked_sections):
+        """Marks the tree as cut short, noting how much was left unchecked at its end."""
+        self.truncated = True
+        self.unchecked_sections = unchecked_sections
+        errors = "error" if self.error_count == 1 else "errors"
+        sections = "section" if unchecked_sections == 1 else "sections"
+        self.tree["…"] = (
+            f"Stopped after {self.error_count} {errors}, "
+            f"{unchecked_sections} {sections} not checked"
+        )
 
-        def traverse_dict(metaconf_sec, tree_sec):
-            for section, section_data in metaconf_sec.items():
-                tree_sec[section] = {}
-                if not isinstance(section_data, dict):
-                    continue
-
-                if "data" in section_data:
-                    for conf_key, conf_data in section_data["data"].items():
-                        # Check missing and error conditions
-                        if conf_data["missing"] and self.include_missing:
-                            self.valid = False
-                            tree_sec[section][conf_key] = "\033[1mMissing\033[0m"
-                        elif conf_data.get("error") is None and self.include_valid:
-                            tree_sec[section][conf_key] = "Valid"
-                        elif not conf_data["error"]:
-                            continue
-                        else:
-                            self.valid = False
-                            tree_sec[section][conf_key] = {
-                                "\033[1merror\033[0m": f"\033[1m{conf_data['error']}\033[0m",
-                                "": "\033[1m^^^^^" + "^" * len(conf_data["error"]) + "\033[0m",
-                                "expected": conf_data.get("type"),
-                                "default": conf_data.get("default", None),
-                            }
-                            # Only add min/max if not None
-                            if conf_data["min"]:
-                                tree_sec[section][conf_key]["min"] = conf_data["min"]
-                            if conf_data["max"]:
-                                tree_sec[section][conf_key]["max"] = conf_data["max"]
-
-                # Child sections processed after options, which looks cleaner
-                if "children" in section_data:
-                    for child_sec in section_data["children"]:
-                        traverse_dict(section_data["children"], tree_sec[section])
-
-        traverse_dict(metaconf, self.tree)
+    def _add_option(self, tree_sec, conf_key, conf_data, missing, error):
+        """Adds a single option to the tree if it's missing, has an error or valid ones are
+        included. `conf_data` provides the type, default, min and max shown with errors."""
+        # Check missing and error conditions
+        if missing and self.include_missing:
+            self.valid = False
+            self.error_count += 1
+            tree_sec[conf_key] = "\033[1mMissing\033[0m"
+        elif error is None and self.include_valid:
+            tree_sec[conf_key] = "Valid"
+        elif not error:
+            return
+        else:
+            self.valid = False
+            self.error_count += 1
+            tree_sec[conf_key] = {
+                "\033[1merror\033[0m": f"\033[1m{error}\033[0m",
+                "": "\033[1m^^^^^" + "^" * len(error) + "\033[0m",
+                "expected": conf_data.get("type"),
+                "default": conf_data.get("default", None),
+            }
+            # Only add min/max if not None
+            if conf_data["min"]:
+                tree_sec[conf_key]["min"] = conf_data["min"]
+            if conf_data["max"]:
+                tree_sec[conf_key]["max"] = conf_data["max"]
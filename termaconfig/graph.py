@@ -0,0 +1,96 @@
+# termaconfig/graph.py
+
+
+class SectionGraph:
+    """The dependencies between sections created by `__parent` and `__toggle`.
+
+    Sections form a forest through `__parent`, which is checked for cycles when the graph is
+    built. `order` lists every section with children before their parents, so tables can be
+    merged into their parents in a single pass whatever order the spec lists them in. The graph
+    only depends on the spec, so `CompiledSpec.section_graph` builds it once and keeps it.
+
+    Args:
+        sections (dict): Section metakeys by dot-notated path, eg a metaconf. Only the `parent`
+            and `toggle` entries of each section are used.
+
+    Raises:
+        ValueError: If sections are (indirectly) each other's parent.
+    """
+
+    def __init__(self, sections):
+        # Parent of every section whose __parent points at an existing section
+        self.parents = {}
+        # Child sections in spec order
+        self.children = {entry: [] for entry in sections}
+        # Sections toggled by an option of each section
+        self.toggled = {entry: [] for entry in sections}
+
+        for entry, details in sections.items():
+            parent = details["parent"]
+            if parent and parent in self.children:
+                self.parents[entry] = parent
+                self.children[parent].append(entry)
+            toggle = details["toggle"]
+            if toggle:
+                toggle_section = toggle if toggle in sections else toggle.rpartition(".")[0]
+                if toggle_section in self.toggled:
+                    self.toggled[toggle_section].append(entry)
+
+        self._check_cycles()
+        self.order = self._merge_order()
+
+    def _check_cycles(self):
+        """Follows every chain of parents once, raising on the first one that loops."""
+        done = set()
+        for entry in self.parents:
+            chain = []
+            seen = set()
+            while entry in self.parents and entry not in done:
+                if entry in seen:
+                    cycle = chain[chain.index(entry) :] + [entry]
+                    raise ValueError(f"Sections are each other's parent: {' -> '.join(cycle)}")
+                seen.add(entry)
+                chain.append(entry)
+                entry = self.parents[entry]
+            done.update(chain)
+
+    def _merge_order(self):
+        """Orders sections so each one comes after all of its children (and theirs)."""
+        order = []
+        for root in self.children:
+            if root in self.parents:
+                continue
+            # Walked without recursion, so long chains of parents can't hit the recursion limit
+            stack = [(root, iter(self.children[root]))]
+            while stack:
+                entry, children = stack[-1]
+                child = next(children, None)
+                if child is None:
+                    order.append(entry)
+                    stack.pop()
+                else:
+                    stack.append((child, iter(self.children[child])))
+        return tuple(order)
+
+    def related(self, sections):
+        """Expands a set of sections with every section merged with them through `__parent`, and
+        every section toggled by them through `__toggle`.
+
+        Args:
+            sections (list): Dot-notated paths of sections.
+
+        Returns:
+            set: The given sections along with everything depending on them.
+        """
+        affected = set()
+        pending = [entry for entry in sections if entry in self.children]
+        while pending:
+            entry = pending.pop()
+            if entry in affected:
+                continue
+            affected.add(entry)
+            pending.extend(self.children[entry])
+            pending.extend(self.toggled[entry])
+            if entry in self.parents:
+                pending.append(self.parents[entry])
+        return affected
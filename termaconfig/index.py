@@ -0,0 +1,61 @@
+# termaconfig/index.py
+
+
+class PathIndex:
+    """Looks up metaconf sections and options by their dot-notated paths.
+
+    Sections are indexed along with links to their parent and child sections, so nothing has to
+    split and walk paths again after parsing. Options are found through their section, eg
+    `basic.other.port` is the `port` entry in the data of section `basic.other`.
+
+    Args:
+        metaconf (dict, optional): A metaconf to index right away. `ConfigParser` builds its
+            index while parsing instead.
+    """
+
+    def __init__(self, metaconf=None):
+        self.sections = {}
+        # Parent section path of every section. Top-level sections have "" as their parent
+        self.parents = {}
+        self.children = {"": []}
+
+        if metaconf:
+            for path, section in metaconf.items():
+                self.add_section(path, section)
+
+    def add_section(self, path, section):
+        """Adds a metaconf section to the index, or points an existing path at a new section."""
+        self.sections[path] = section
+        self._link(path)
+
+    def _link(self, path):
+        if path in self.parents:
+            return
+        parent_path = path.rpartition(".")[0]
+        self.parents[path] = parent_path
+        self.children.setdefault(path, [])
+        self.children.setdefault(parent_path, []).append(path)
+        # Parents missing from the metaconf still get linked so their children can be reached
+        if parent_path:
+            self._link(parent_path)
+
+    def get(self, path):
+        """Returns the metaconf section or option at a dot-notated path.
+
+        Raises:
+            KeyError: If nothing exists at the path.
+        """
+        if path in self.sections:
+            return self.sections[path]
+        section_path, _, key = path.rpartition(".")
+        section = self.sections.get(section_path, None)
+        if not section or key not in section["data"]:
+            raise KeyError(f"Path {path} not found in metaconf.")
+        return section["data"][key]
+
+    def section_path(self, path):
+        """Returns the path of the section holding a dot-notated path (or the path itself if it's
+        a section)."""
+        if path in self.sections:
+            return path
+        return path.rpartition(".")[0]
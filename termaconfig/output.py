@@ -0,0 +1,34 @@
+# termaconfig/output.py
+
+import logging as log
+
+# Log level used when writing to a logger. Just above INFO so it stands out a little.
+OUTPUT_LOG_LEVEL = log.INFO + 3
+
+
+def make_sink(output, level=OUTPUT_LOG_LEVEL):
+    """Creates a function that writes single lines of output to a target.
+
+    Args:
+        output: Where lines should go. Any of:
+            None: Lines are discarded.
+            logging.Logger: Each line is logged at `level`.
+            text stream (has `write`): Each line is written followed by a newline.
+            callable: Called with each line.
+        level (int, optional): Log level used for loggers.
+
+    Returns:
+        callable: A function taking one line (str) at a time.
+
+    Raises:
+        TypeError: If the output target isn't one of the supported types.
+    """
+    if output is None:
+        return lambda line: None
+    if isinstance(output, log.Logger):
+        return lambda line: output.log(level, line)
+    if hasattr(output, "write"):
+        return lambda line: output.write(f"{line}\n")
+    if callable(output):
+        return output
+    raise TypeError(f"Output must be a logger, text stream, callable or None, got: {output}")
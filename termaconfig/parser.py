@@ -1,87 +1,127 @@
 # termaconfig/parser.py
 
-import termaconfig as tc
 import termaconfig.utils as util
+from termaconfig.index import PathIndex
+from termaconfig.records import ParamMeta, SectionMeta
+from termaconfig.spec import CompiledSpec
 
 
 class ConfigParser:
     """Creates a combined 'metaconf' dict containing all relevant info about a configuration.
 
     It's designed and intended for ConfigObj, but will work with any similarly formatted inputs.
+    The spec can be a loaded spec dict or a `CompiledSpec`, which skips re-parsing the spec when
+    the same one is used for many configs.
     """
 
     def __init__(self, config, spec, vtd_result, **kwargs):
-        self.delimiter = kwargs.get("delimiter", "__")
+        if not isinstance(spec, CompiledSpec):
+            spec = CompiledSpec(spec, delimiter=kwargs.get("delimiter", "__"))
+        self.delimiter = spec.delimiter
 
         self.spec = spec
         self.vtd_result = vtd_result
 
-        self.metaconf = self._traverse_configspec([], config, spec, {})
+        # Filled in while parsing, for looking up anything in metaconf by its dot-notated path
+        self.index = PathIndex()
+        self.metaconf = self._traverse_configspec(config)
 
-    def _traverse_configspec(self, keys, config, opperating_dict, metaconf):
+    def get(self, path):
+        """Returns the metaconf section or option at a dot-notated path, eg `basic.other.port`.
+
+        Raises:
+            KeyError: If nothing exists at the path.
+        """
+        return self.index.get(path)
+
+    def update(self, config, vtd_result, sections):
+        """Re-parses only the given sections, replacing their entries in `metaconf`.
+
+        Args:
+            config (dict): The loaded config, with the changed sections already validated.
+            vtd_result (dict): Validation results for the whole config.
+            sections (list): Dot-notated paths of the sections to parse again.
+        """
+        self.vtd_result = vtd_result
+        self.metaconf.update(self._traverse_configspec(config, sections))
+        return self.metaconf
+
+    def _traverse_configspec(self, config, sections=None):
         """
-        Recursively searches in a provided config specification and an assotiated, validated config.
+        Walks the compiled specification alongside an assotiated, validated config.
         A `meta_conf` dict is created containing parsed metakey information, error results, defaults
         and values from the input config.
         """
         # Validate inputs
-        if not isinstance(opperating_dict, dict):
-            raise TypeError(f"Expected loaded specification dict, not '{opperating_dict}'")
         if not isinstance(config, dict):
             raise TypeError(f"Expected loaded config dict, not '{config}'")
 
-        key_path = ".".join(keys)
-        if key_path and key_path not in metaconf:
-            metaconf[key_path] = {}
-            metaconf[key_path]["data"] = {}
-            metaconf[key_path] = util.fill_required_keys(metaconf[key_path], tc.REQUIRED_SEC_KEYS)
-        for key, value in opperating_dict.items():
-            value = util.sanitize_str(value)
-            current_keys = keys + [key]
-            # parent_key is empty if there was nothing before delimiter (section metakey)
-            parent_key = key.split(self.delimiter)[0]
-            meta_key = key.split(self.delimiter)[-1]
-            value_from_config = None
-            if parent_key:
-                try:
-                    value_from_config = util.sanitize_str(
-                        util.get_nested_value(config, keys + [parent_key])
-                    )
-                except KeyError:
-                    metaconf[key_path]["data"][parent_key] = {"missing": True}
-
-            if self.delimiter in key:
-                # Section configs start with delimiter
-                if key.startswith(self.delimiter):
-                    metaconf[key_path][meta_key] = value
-                # Per-setting values get added to a respective nested dict
-                else:
-                    # Initialize target setting dict if needed
-                    if parent_key not in metaconf[key_path]["data"]:
-                        metaconf[key_path]["data"][parent_key] = {}
-
-                    metaconf[key_path]["data"][parent_key][meta_key] = value
-            elif isinstance(value, dict):
-                # Recursively traverse nested sections
-                metaconf = self._traverse_configspec(current_keys, config, value, metaconf)
+        metaconf = {}
+        self._traverse_section("", config, self.vtd_result, metaconf, sections)
+        return metaconf
+
+    def _traverse_section(self, key_path, config_section, result_section, metaconf, sections):
+        """Recursively parses a spec section and its subsections into `metaconf`.
+
+        The config and validation results are walked together with the spec, so each section is
+        found directly from its parent instead of being looked up from the root.
+        """
+        compiled = self.spec.sections[key_path]
+        # Options at the root of a spec don't belong to any table
+        if key_path and (sections is None or key_path in sections):
+            metaconf[key_path] = self.parse_section(compiled, config_section, result_section)
+            self.index.add_section(key_path, metaconf[key_path])
+
+        for key in compiled["sections"]:
+            child_config = config_section[key] if key in config_section else {}
+            if not isinstance(child_config, dict):
+                child_config = {}
+            # Fully valid (True) or fully missing (False) sections are squashed in the results
+            if isinstance(result_section, dict):
+                child_result = result_section.get(key, True)
             else:
-                data = metaconf[key_path]["data"]
-                if key not in data:
-                    data[key] = {}
-                    data[key] = util.fill_required_keys(data[key], tc.REQUIRED_PARAM_KEYS)
-                data[key] = self.get_vtd_results(data[key], keys + [parent_key])
-                data[key] = self.get_spec_info(data[key], value)
-                data[key]["value"] = value_from_config
+                child_result = result_section
 
-        return metaconf
+            child_path = f"{key_path}.{key}" if key_path else key
+            self._traverse_section(child_path, child_config, child_result, metaconf, sections)
 
-    def get_vtd_results(self, data, keys):
+    def parse_section(self, compiled, config_section, result_section):
+        """Fills a compiled spec section with values and validation results from the config.
+
+        Returns:
+            SectionMeta: The metaconf entry for the section.
+        """
+        section = SectionMeta(compiled["template"])
+        data = section.data = {}
+        for key, template in compiled["params"].items():
+            # Subsections only get an entry when they're missing from the config
+            if template is None:
+                if key not in config_section:
+                    data[key] = ParamMeta({"missing": True})
+                continue
+
+            param = data[key] = ParamMeta(template)
+            if key in config_section:
+                value = config_section[key]
+                # A section given in place of an option fails validation, so it isn't sanitized
+                param.value = value if isinstance(value, dict) else util.sanitize_str(value)
+            else:
+                param.value = None
+            # Metakeys without a matching spec option only know whether they're in the config
+            if "spec" in template:
+                self.get_vtd_results(param, result_section, key)
+            else:
+                param.missing = key not in config_section
+
+        return section
+
+    def get_vtd_results(self, data, result_section, key):
         """Retrieves validation results and adds relevant `error` and `missing` entries."""
 
-        try:
-            result = util.get_nested_value(self.vtd_result, keys)
-        except KeyError:
-            result = True
+        if isinstance(result_section, dict):
+            result = result_section.get(key, True)
+        else:
+            result = result_section
 
         # Value is present and valid
         if result is True:
@@ -97,31 +137,3 @@ class ConfigParser:
             data["missing"] = False
 
         return data
-
-    def get_spec_info(self, data, spec_value):
-        """Extracts type and constraints from the specification string."""
-        spec_type, spec_params = util.parse_string_values(spec_value)
-        # Handle both possible types of minmax entries (valueless and key=value pairs)
-        if not isinstance(spec_params, dict):
-            data.update({"spec": spec_value, "type": spec_type})
-            return data
-        for k, v in spec_params.items():
-            if v is None:
-                if data["min"] is None:
-                    data["min"] = k
-                else:
-                    data["max"] = k
-                    break
-        if "min" in spec_params:
-            data["min"] = spec_params["min"]
-        if "max" in spec_params:
-            data["max"] = spec_params["max"]
-
-        if "default" in spec_params:
-            default = spec_params["default"]
-        else:
-            default = None
-
-        data.update({"spec": spec_value, "type": spec_type, "default": default})
-
-        return data
@@ -0,0 +1,189 @@
+# termaconfig/records.py
+
+from collections.abc import Mapping, MutableMapping
+from operator import attrgetter
+
+# All valid options should be initialized with None
+REQUIRED_SEC_KEYS = [
+    "title",
+    "header",
+    "type",
+    "wrap",
+    "limit",
+    "page",
+    "parent",
+    "spacer",
+    "ignore",
+    "toggle",
+]
+REQUIRED_PARAM_KEYS = [
+    "default",
+    "type",
+    "min",
+    "max",
+    "error",
+    "missing",
+    "title",
+    "note",
+    "ignore",
+]
+
+# Marks slots that haven't been set (or were deleted), so they don't show up as keys
+_UNSET = object()
+
+
+class MetaRecord(MutableMapping):
+    """Base for compact metaconf entries that read like the dicts they replace.
+
+    Known keys are stored in slots instead of a per-entry dict, and anything else (eg custom
+    metakeys) goes into a small `extra` dict only when needed. Entries support everything a
+    dict does (`copy`, `update`, `pop`, `setdefault`, `|` and comparison with dicts included),
+    but aren't dict instances. Use `as_dict()`, `metaconf_as_dict` or `json_default` where plain
+    dicts are needed.
+    """
+
+    __slots__ = ("extra",)
+    # Keys that are always present (None if not set), then ones only present once set
+    required_keys = ()
+    optional_keys = ()
+    _slot_keys = frozenset()
+
+    def __init__(self, values=None):
+        for key in self.required_keys:
+            setattr(self, key, None)
+        for key in self.optional_keys:
+            setattr(self, key, _UNSET)
+        self.extra = None
+        if values:
+            for key, value in values.items():
+                self[key] = value
+
+    def __getitem__(self, key):
+        if key in self._slot_keys:
+            value = getattr(self, key)
+            if value is _UNSET:
+                raise KeyError(key)
+            return value
+        if self.extra is not None and key in self.extra:
+            return self.extra[key]
+        raise KeyError(key)
+
+    def __setitem__(self, key, value):
+        if key in self._slot_keys:
+            setattr(self, key, value)
+        else:
+            if self.extra is None:
+                self.extra = {}
+            self.extra[key] = value
+
+    def __delitem__(self, key):
+        if key in self._slot_keys:
+            if getattr(self, key) is _UNSET:
+                raise KeyError(key)
+            setattr(self, key, _UNSET)
+        elif self.extra is not None and key in self.extra:
+            del self.extra[key]
+        else:
+            raise KeyError(key)
+
+    def __iter__(self):
+        for key in self.required_keys:
+            if getattr(self, key) is not _UNSET:
+                yield key
+        for key in self.optional_keys:
+            if getattr(self, key) is not _UNSET:
+                yield key
+        if self.extra is not None:
+            yield from self.extra
+
+    def __len__(self):
+        return sum(1 for _ in self)
+
+    def __repr__(self):
+        return f"{type(self).__name__}({dict(self)!r})"
+
+    def __or__(self, other):
+        if not isinstance(other, Mapping):
+            return NotImplemented
+        record = self.copy()
+        record.update(other)
+        return record
+
+    def __ror__(self, other):
+        if not isinstance(other, Mapping):
+            return NotImplemented
+        return {**other, **self.as_dict()}
+
+    def __ior__(self, other):
+        self.update(other)
+        return self
+
+    def copy(self):
+        """Returns a shallow copy of the entry, of the same type."""
+        record = object.__new__(type(self))
+        for key in self._slot_keys:
+            setattr(record, key, getattr(self, key))
+        record.extra = None if self.extra is None else dict(self.extra)
+        return record
+
+    __copy__ = copy
+
+    def as_dict(self):
+        """Returns the entry as a plain dict. Same as `dict(entry)`, only much faster."""
+        values = dict(zip(self.required_keys, self._get_required(self)))
+        if _UNSET in values.values():
+            values = {key: value for key, value in values.items() if value is not _UNSET}
+        for key in self.optional_keys:
+            value = getattr(self, key)
+            if value is not _UNSET:
+                values[key] = value
+        if self.extra:
+            values.update(self.extra)
+        return values
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        cls._slot_keys = frozenset(cls.required_keys) | frozenset(cls.optional_keys)
+        cls._get_required = staticmethod(attrgetter(*cls.required_keys))
+
+
+class SectionMeta(MetaRecord):
+    """A metaconf section: its metakeys and a `data` dict of `ParamMeta` entries."""
+
+    __slots__ = ("data", *REQUIRED_SEC_KEYS)
+    required_keys = ("data", *REQUIRED_SEC_KEYS)
+
+
+class ParamMeta(MetaRecord):
+    """A metaconf option: its spec details, metakeys, validation results and config value."""
+
+    __slots__ = (*REQUIRED_PARAM_KEYS, "spec", "value")
+    required_keys = tuple(REQUIRED_PARAM_KEYS)
+    optional_keys = ("spec", "value")
+
+
+def json_default(obj):
+    """A `default` for `json.dump(s)` that writes metaconf entries as plain dicts.
+
+    eg `json.dumps(config.metaconf, default=json_default)`
+    """
+    if isinstance(obj, MetaRecord):
+        return obj.as_dict()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def metaconf_as_dict(metaconf):
+    """Returns a copy of a metaconf with every entry turned into a plain dict.
+
+    For code that expects the metaconf to be dicts all the way down, eg `isinstance(x, dict)`
+    checks or `json.dumps(metaconf_as_dict(config.metaconf))`.
+    """
+    return _plain_dict(metaconf)
+
+
+def _plain_dict(value):
+    if isinstance(value, MetaRecord):
+        value = value.as_dict()
+    elif not isinstance(value, dict):
+        return value
+    return {key: _plain_dict(item) for key, item in value.items()}
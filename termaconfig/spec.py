@@ -0,0 +1,324 @@
+# termaconfig/spec.py
+
+import io
+import logging as log
+import os
+import sys
+
+from configobj import ConfigObj
+from configobj.validate import Validator
+
+import termaconfig.utils as util
+from termaconfig.graph import SectionGraph
+from termaconfig.records import REQUIRED_PARAM_KEYS, REQUIRED_SEC_KEYS
+from termaconfig.version import __version__
+
+# Bump whenever the layout of compiled sections changes so stale cache files are never read
+CACHE_VERSION = 6
+
+
+class CompiledSpec:
+    """A configuration specification that has been read and parsed once, ready to be reused.
+
+    Everything about a spec that doesn't depend on a config is worked out up front: the ConfigObj
+    configspec used for validation, section metakeys, per-option metakeys and the type, min, max
+    and default values taken from each check string. Pass an instance wherever a spec is accepted
+    (`TermaConfig`, `ConfigParser`, `ConfigTables`) and only the config values need to be read.
+
+    Args:
+        spec (str, file-like object, dict): A path to a spec file, an open spec file, or an
+            already loaded spec dict (such as a ConfigObj configspec).
+        delimiter (str, optional): The metakey delimiter. `__` by default.
+        cache_dir (str, optional): A directory to keep compiled specs in between runs. Entries
+            are keyed by a hash of the spec contents and delimiter, so an edited spec is simply
+            compiled again. Only applies to specs read from a path or file.
+    """
+
+    def __init__(self, spec, **kwargs):
+        self.delimiter = kwargs.get("delimiter", "__")
+        self.cache_dir = kwargs.get("cache_dir", None)
+        # Set to True when the compiled spec was loaded from cache_dir
+        self.cached = False
+
+        # Validator caches parsed check strings, so sharing one keeps repeat validation cheap
+        self.validator = Validator()
+
+        self.sections = {}
+        self.headers = {}
+        self._section_graph = None
+        self._validation_spec = None
+
+        if isinstance(spec, dict):
+            self.configspec = spec if isinstance(spec, ConfigObj) else ConfigObj(spec, _inspec=True)
+            self._compile_section([], self.configspec)
+            return
+
+        spec_text = self._read_spec(spec)
+        cache_path = self._cache_path(spec_text) if self.cache_dir else None
+        if cache_path and self._load_cache(cache_path):
+            return
+
+        self.configspec = ConfigObj(util.preprocess_config(io.StringIO(spec_text)), _inspec=True)
+        self._compile_section([], self.configspec)
+        if cache_path:
+            self._write_cache(cache_path)
+
+    @property
+    def validation_spec(self):
+        """The configspec without metakeys, to validate configs against.
+
+        Metakeys left in a configspec always fail validation as missing options, so sections
+        would never come back as fully valid. Validated against this instead, they do, and
+        `iter_failures` can skip them.
+        """
+        if self._validation_spec is None:
+            self._validation_spec = ConfigObj(
+                util.strip_metakeys(self.configspec.dict(), self.delimiter), _inspec=True
+            )
+        return self._validation_spec
+
+    @property
+    def section_graph(self):
+        """The `SectionGraph` of the spec's `__parent` and `__toggle` metakeys, built once."""
+        if self._section_graph is None:
+            self._section_graph = SectionGraph(
+                {path: compiled["template"] for path, compiled in self.sections.items() if path}
+            )
+        return self._section_graph
+
+    def iter_failures(self, result, config=None, path=""):
+        """Yields `(section_path, key, result)` for every option that failed validation.
+
+        Walks the results of ConfigObj's `validate(preserve_errors=True)` like
+        `configobj.flatten_errors`, but only checks options with a check string, since the metakeys
+        kept in the configspec always come back as missing. Fully valid sections (see
+        `validation_spec`) are skipped, apart from looking up options that only have metakeys. `result` is False for missing
+        options and the error otherwise. Options are yielded in the same order as in metaconf,
+        each section's own options before its subsections, and options at the root of the spec
+        are left out.
+
+        Args:
+            result (dict or bool): The validation results.
+            config (dict, optional): The validated config. If given, options that only have
+                metakeys in the spec are yielded as missing when they aren't in the config, the
+                same way `ConfigParser` marks them.
+            path (str, optional): Dot-notated path of the section the results belong to.
+        """
+        if result is True:
+            # Nothing failed below here, so only missing options without a check string are left
+            if config is not None:
+                yield from self._iter_missing_metakeys(config, path)
+            return
+        compiled = self.sections[path]
+        if path:
+            for key, template in compiled["params"].items():
+                if template is None:
+                    continue
+                if "spec" in template:
+                    key_result = result.get(key, True) if isinstance(result, dict) else result
+                    if key_result is not True:
+                        yield path, key, key_result
+                elif config is not None and key not in config:
+                    yield path, key, False
+
+        for key in compiled["sections"]:
+            child_result = result.get(key, True) if isinstance(result, dict) else result
+            child_config = None
+            if config is not None:
+                child_config = config[key] if key in config else {}
+                if not isinstance(child_config, dict):
+                    child_config = {}
+            yield from self.iter_failures(
+                child_result, child_config, f"{path}.{key}" if path else key
+            )
+
+    def _iter_missing_metakeys(self, config, path):
+        """Yields `(section_path, key, False)` for options with only metakeys in the spec that
+        are missing from the config, in the section at `path` and its subsections."""
+        depth = len(self.sections[path]["keys"])
+        for section_path in self.sections[path]["metakey_sections"]:
+            compiled = self.sections[section_path]
+            section = config
+            for key in compiled["keys"][depth:]:
+                section = section[key] if key in section else {}
+                if not isinstance(section, dict):
+                    section = {}
+            for key in compiled["metakey_params"]:
+                if key not in section:
+                    yield section_path, key, False
+
+    def _read_spec(self, spec_file):
+        if isinstance(spec_file, str):
+            try:
+                with open(spec_file, "r") as file:
+                    return file.read()
+            except FileNotFoundError:
+                raise FileNotFoundError(f"Specification file not found: {spec_file}")
+            except PermissionError:
+                raise PermissionError(f"Failed opening specification file: {spec_file}")
+
+        if not isinstance(spec_file, io.TextIOBase):
+            raise TypeError(
+                f"Input specification is neither a filepath nor filedata object: {spec_file}"
+            )
+
+        return spec_file.read()
+
+    def _cache_path(self, spec_text):
+        """Returns the cache file path for the spec contents.
+
+        The hash covers everything a compiled spec depends on, including the marshal format of
+        the running interpreter, so entries can never be read back by something incompatible.
+        """
+        # Caching is opt-in, so its modules are only imported once a cache_dir is used
+        import hashlib
+        import marshal
+
+        spec_hash = hashlib.sha256()
+        for part in (__version__, CACHE_VERSION, marshal.version, self.delimiter):
+            spec_hash.update(f"{part}\0".encode())
+        spec_hash.update(spec_text.encode())
+        return os.path.join(self.cache_dir, f"{spec_hash.hexdigest()}.spec")
+
+    def _load_cache(self, cache_path):
+        """Loads compiled sections from a cache file. Returns False if it can't be used."""
+        import marshal
+
+        try:
+            with open(cache_path, "rb") as cache_file:
+                cached = marshal.load(cache_file)
+            configspec, sections, headers = (
+                cached["configspec"],
+                cached["sections"],
+                cached["headers"],
+            )
+        except FileNotFoundError:
+            return False
+        except (OSError, EOFError, ValueError, TypeError, KeyError) as e:
+            log.debug(f"Ignoring unreadable spec cache {cache_path}: {e}")
+            return False
+
+        self.configspec = ConfigObj(configspec, _inspec=True)
+        self.sections = sections
+        self.headers = headers
+        self.cached = True
+        return True
+
+    def _write_cache(self, cache_path):
+        """Writes compiled sections to a cache file.
+
+        The file is written next to its final path and then moved into place, so concurrent
+        readers only ever see complete entries. Failing to write is not an error.
+        """
+        import marshal
+        import tempfile
+
+        cached = {
+            "configspec": self.configspec.dict(),
+            "sections": self.sections,
+            "headers": self.headers,
+        }
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            fd, temp_path = tempfile.mkstemp(dir=self.cache_dir, suffix=".tmp")
+            try:
+                with os.fdopen(fd, "wb") as temp_file:
+                    marshal.dump(cached, temp_file)
+                os.replace(temp_path, cache_path)
+            except BaseException:
+                os.unlink(temp_path)
+                raise
+        except OSError as e:
+            log.debug(f"Failed writing spec cache {cache_path}: {e}")
+
+    def _compile_section(self, keys, spec_section):
+        """Recursively compiles a spec section into `self.sections`, keyed by dot-notated path.
+
+        Each compiled section holds a `template` with the section metakeys, a `params` dict of
+        option templates and the names of its subsections in `sections`. Subsections are also
+        listed in `params` as None so they keep their place in the spec order.
+
+        Options without a check string (only metakeys) are listed in `metakey_params`, and
+        `metakey_sections` lists the sections with any of those in this section's subtree, so
+        `iter_failures` can find them without walking every option.
+        """
+        key_path = ".".join(keys)
+        template = {"data": None}
+        template = util.fill_required_keys(template, REQUIRED_SEC_KEYS)
+        params = {}
+        compiled = {"keys": tuple(keys), "template": template, "params": params, "sections": []}
+        # Where the section comes in the spec order, which is also the order sections are walked in
+        compiled["position"] = len(self.sections)
+        self.sections[key_path] = compiled
+
+        for key, value in spec_section.items():
+            # Keys repeat across every config parsed with this spec, so share one copy of each
+            key = sys.intern(key)
+            if isinstance(value, dict):
+                if key not in params:
+                    params[key] = None
+                compiled["sections"].append(key)
+                self._compile_section(keys + [key], value)
+                continue
+
+            value = util.sanitize_str(value)
+            key_parts = [sys.intern(part) for part in key.split(self.delimiter)]
+            # parent_key is empty if there was nothing before delimiter (section metakey)
+            parent_key = key_parts[0]
+            meta_key = key_parts[-1]
+
+            if self.delimiter in key:
+                # Section configs start with delimiter
+                if key.startswith(self.delimiter):
+                    template[meta_key] = value
+                # Per-setting values get added to a respective template
+                else:
+                    if params.get(parent_key) is None:
+                        params[parent_key] = util.fill_required_keys({}, REQUIRED_PARAM_KEYS)
+                    params[parent_key][meta_key] = value
+            else:
+                if params.get(key) is None:
+                    params[key] = util.fill_required_keys({}, REQUIRED_PARAM_KEYS)
+                params[key] = self.get_spec_info(params[key], value)
+
+        # Options at the root of a spec don't belong to any table, so they're never reported
+        compiled["metakey_params"] = [
+            key for key, param in params.items() if key_path and param and "spec" not in param
+        ]
+        compiled["metakey_sections"] = [key_path] if compiled["metakey_params"] else []
+        for key in compiled["sections"]:
+            child_path = f"{key_path}.{key}" if key_path else key
+            compiled["metakey_sections"].extend(self.sections[child_path]["metakey_sections"])
+
+        if template["header"]:
+            self.headers[key_path] = util.parse_header(template["header"])
+
+        return compiled
+
+    def get_spec_info(self, data, spec_value):
+        """Extracts type and constraints from the specification string."""
+        spec_type, spec_params = util.parse_string_values(spec_value)
+        # Handle both possible types of minmax entries (valueless and key=value pairs)
+        if not isinstance(spec_params, dict):
+            data.update({"spec": spec_value, "type": spec_type})
+            return data
+        for k, v in spec_params.items():
+            if v is None:
+                if data["min"] is None:
+                    data["min"] = k
+                else:
+                    data["max"] = k
+                    break
+        if "min" in spec_params:
+            data["min"] = spec_params["min"]
+        if "max" in spec_params:
+            data["max"] = spec_params["max"]
+
+        if "default" in spec_params:
+            default = spec_params["default"]
+        else:
+            default = None
+
+        data.update({"spec": spec_value, "type": spec_type, "default": default})
+
+        return data
@@ -0,0 +1,102 @@
+# termaconfig/stats.py
+
+import time
+import tracemalloc
+from contextlib import contextmanager
+
+
+class StageStats:
+    """Measurements for a single stage of loading a config.
+
+    Attributes:
+        name (str): The stage name, eg `validate`.
+        wall_time (float): Seconds the stage took. None until the stage ends.
+        nodes (int): How many things the stage worked through (lines, sections, options or
+            tables, depending on the stage). None if not counted.
+        memory_peak (int): Peak bytes allocated during the stage, if memory tracing was enabled.
+    """
+
+    __slots__ = ("memory_peak", "name", "nodes", "wall_time")
+
+    def __init__(self, name):
+        self.name = name
+        self.wall_time = None
+        self.nodes = None
+        self.memory_peak = None
+
+    def as_dict(self):
+        return {
+            "wall_time": self.wall_time,
+            "nodes": self.nodes,
+            "memory_peak": self.memory_peak,
+        }
+
+    def __repr__(self):
+        return f"StageStats({self.name!r}, {self.as_dict()!r})"
+
+
+class LoadStats:
+    """Collects per-stage timings while a config is loaded.
+
+    Stages are recorded in the order they ran, and a stage that runs again (eg on reload after
+    a `reset()`) replaces the old entry. Nothing is measured unless enabled, or a hook is given.
+
+    Args:
+        enabled (bool, optional): Whether to record stages.
+        trace_memory (bool, optional): Also record the peak memory allocated in each stage with
+            `tracemalloc`. This slows loading down considerably.
+        hook (callable, optional): Called with `("start", stage)` and `("end", stage)` around
+            every stage, where `stage` is its `StageStats`. Giving a hook enables recording.
+    """
+
+    def __init__(self, **kwargs):
+        self.hook = kwargs.get("hook", None)
+        self.enabled = kwargs.get("enabled", False) or self.hook is not None
+        self.trace_memory = kwargs.get("trace_memory", False)
+        self.stages = {}
+
+    def reset(self):
+        self.stages = {}
+
+    @property
+    def wall_time(self):
+        """Total seconds taken by every recorded stage."""
+        return sum(stage.wall_time or 0 for stage in self.stages.values())
+
+    def as_dict(self):
+        return {name: stage.as_dict() for name, stage in self.stages.items()}
+
+    @contextmanager
+    def stage(self, name):
+        """Measures the code run inside the context as a stage.
+
+        Yields the stage's `StageStats`, so the caller can fill in `nodes`.
+        """
+        stage = StageStats(name)
+        if not self.enabled:
+            yield stage
+            return
+
+        self.stages.pop(name, None)
+        self.stages[name] = stage
+        started_tracing = False
+        if self.trace_memory:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+                started_tracing = True
+            tracemalloc.reset_peak()
+            memory_start = tracemalloc.get_traced_memory()[0]
+
+        if self.hook:
+            self.hook("start", stage)
+        start = time.perf_counter()
+        try:
+            yield stage
+        finally:
+            stage.wall_time = time.perf_counter() - start
+            if self.trace_memory:
+                stage.memory_peak = tracemalloc.get_traced_memory()[1] - memory_start
+                if started_tracing:
+                    tracemalloc.stop()
+            if self.hook:
+                self.hook("end", stage)
@@ -0,0 +1,96 @@
+# termaconfig/structured.py
+
+import json
+
+from termaconfig.output import make_sink
+from termaconfig.records import MetaRecord
+
+FORMATS = ("json", "ndjson")
+
+
+def iter_option_records(metaconf):
+    """Yields a record for every option in a metaconf, in metaconf order.
+
+    Records are plain dicts holding the option's dot-notated `path` along with everything in
+    its metaconf entry (value, type, default, min, max, error, missing and any metakeys).
+
+    Args:
+        metaconf (dict): The metaconf from `ConfigParser`.
+
+    Yields:
+        dict: `{"kind": "option", "path": ..., **entry}` for each option.
+    """
+    for section_path, section in metaconf.items():
+        for key, data in section["data"].items():
+            record = {"kind": "option", "path": f"{section_path}.{key}"}
+            record.update(data.as_dict() if isinstance(data, MetaRecord) else data)
+            yield record
+
+
+def iter_error_records(vtd_result, spec, **kwargs):
+    """Yields a record for every option that failed validation, straight from the results.
+
+    Like `ErrorTree.from_results`, only failing options are visited and no metaconf is needed.
+
+    Args:
+        vtd_result (dict or bool): Results of ConfigObj's `validate(preserve_errors=True)`.
+        spec (CompiledSpec): The spec the config was validated with.
+        config (dict, optional): The validated config, to find missing options that only have
+            metakeys in the spec.
+        include_missing (bool, optional): Whether to include missing options. True by default.
+
+    Yields:
+        dict: `{"kind": "error", "path": ..., "error": ..., "missing": ...}` along with the
+            option's type, default, min and max.
+    """
+    include_missing = kwargs.get("include_missing", True)
+    for path, key, result in spec.iter_failures(vtd_result, kwargs.get("config", None)):
+        if result is False and not include_missing:
+            continue
+        template = spec.sections[path]["params"][key]
+        yield {
+            "kind": "error",
+            "path": f"{path}.{key}",
+            "error": None if result is False else str(result),
+            "missing": result is False,
+            "type": template.get("type"),
+            "default": template.get("default"),
+            "min": template.get("min"),
+            "max": template.get("max"),
+        }
+
+
+def write_records(records, output, output_format="ndjson"):
+    """Writes records out as JSON, without any terminal formatting.
+
+    Args:
+        records (iterable): Dicts to write, eg from `iter_option_records`.
+        output: Any output target accepted by `make_sink`.
+        output_format (str, optional): `ndjson` writes each record on its own line as it comes.
+            `json` writes all records as a single JSON array on one line.
+
+    Returns:
+        int: How many records were written.
+
+    Raises:
+        ValueError: If the format isn't one of `FORMATS`.
+    """
+    if output_format not in FORMATS:
+        raise ValueError(f"Expected output_format to be one of {', '.join(FORMATS)}")
+    sink = make_sink(output)
+    # Anything JSON doesn't know (eg values converted by a custom check) is written as a string
+    encoder = json.JSONEncoder(ensure_ascii=False, default=str)
+
+    count = 0
+    if output_format == "ndjson":
+        for record in records:
+            sink(encoder.encode(record))
+            count += 1
+        return count
+
+    parts = []
+    for record in records:
+        parts.append(encoder.encode(record))
+        count += 1
+    sink(f"[{', '.join(parts)}]")
+    return count
@@ -0,0 +1,243 @@
+# termaconfig/tables.py
+
+import functools
+import re
+import unicodedata
+
+import terminaltables3 as tt3
+from terminaltables3.base_table import BaseTable
+from terminaltables3.other_tables import UnixTable
+
+from termaconfig.exceptions import TableTypeError
+
+RE_COLOR_ANSI = re.compile(r"(\033\[[\d;]+m)")
+
+
+@functools.lru_cache(maxsize=8192)
+def _wide_width(string):
+    if "\033" in string:
+        string = RE_COLOR_ANSI.sub("", string)
+    return sum(2 if unicodedata.east_asian_width(char) in ("F", "W") else 1 for char in string)
+
+
+def visible_width(string):
+    """Returns how many columns a string takes up in a terminal, same as terminaltables3.
+
+    Wide (eg CJK) characters count twice and color codes don't count. Plain ASCII strings are
+    measured directly, everything else is cached.
+    """
+    if string.isascii() and "\033" not in string:
+        return len(string)
+    return _wide_width(string)
+
+
+class NativeTable(tt3.AsciiTable):
+    """A table renderer producing exactly the same output as terminaltables3, only faster.
+
+    Column widths are worked out once per table, display widths are cached, and every line is
+    collected in a single buffer that's joined at the end. It's a drop-in `AsciiTable` with all
+    of its options, so it can be used anywhere a `tabletype` is accepted. Use `native_table()`
+    (or `NativeSingleTable`/`NativeDoubleTable`) to get a version of another terminaltables3
+    class.
+
+    Args:
+        table_data (list): List of rows, each a list of cell strings.
+        title (str, optional): Title to show within the top border of the table.
+    """
+
+    # Box-drawing tables switch character sets around every border character. Neighbouring
+    # switches cancel out and are removed from the result, like terminaltables3 does.
+    join_escapes = False
+
+    @property
+    def table(self):
+        """Returns the entire table as a string ready to be printed to the terminal."""
+        rows = [
+            [cell if isinstance(cell, str) else str(cell) for cell in row]
+            for row in self.table_data
+        ]
+        inner_widths = [0] * (max(len(row) for row in rows) if rows else 0)
+        heights = [0] * len(rows)
+        for row_index, row in enumerate(rows):
+            for column, cell in enumerate(row):
+                if not cell:
+                    continue
+                heights[row_index] = max(heights[row_index], cell.count("\n") + 1)
+                for line in cell.splitlines():
+                    width = visible_width(line)
+                    if width > inner_widths[column]:
+                        inner_widths[column] = width
+        outer_widths = [self.padding_left + width + self.padding_right for width in inner_widths]
+
+        lines = []
+        if self.outer_border:
+            lines.append(self._border("top", outer_widths))
+        last_row = len(rows) - 1
+        for row_index, row in enumerate(rows):
+            if self.inner_heading_row_border and row_index == 0:
+                style = "heading"
+            elif self.inner_footing_row_border and row_index == last_row:
+                style = "footing"
+            else:
+                style = "row"
+            self._add_row_lines(lines, row, style, inner_widths, heights[row_index])
+            if row_index == last_row:
+                break
+            if self.inner_heading_row_border and row_index == 0:
+                lines.append(self._border("heading", outer_widths))
+            elif self.inner_footing_row_border and row_index == last_row - 1:
+                lines.append(self._border("footing", outer_widths))
+            elif self.inner_row_border:
+                lines.append(self._border("row", outer_widths))
+        if self.outer_border:
+            lines.append(self._border("bottom", outer_widths))
+
+        table = "\n".join(lines)
+        if self.join_escapes:
+            table = table.replace("\033(B\033(0", "")
+        return table
+
+    def _add_row_lines(self, lines, row, style, inner_widths, height):
+        """Pads and aligns the cells of a row, adding each of its lines to `lines`."""
+        if style == "heading":
+            left, center, right = (
+                self.CHAR_H_OUTER_LEFT_VERTICAL,
+                self.CHAR_H_INNER_VERTICAL,
+                self.CHAR_H_OUTER_RIGHT_VERTICAL,
+            )
+        elif style == "footing":
+            left, center, right = (
+                self.CHAR_F_OUTER_LEFT_VERTICAL,
+                self.CHAR_F_INNER_VERTICAL,
+                self.CHAR_F_OUTER_RIGHT_VERTICAL,
+            )
+        else:
+            left, center, right = (
+                self.CHAR_OUTER_LEFT_VERTICAL,
+                self.CHAR_INNER_VERTICAL,
+                self.CHAR_OUTER_RIGHT_VERTICAL,
+            )
+        if not self.outer_border:
+            left = right = ""
+        if not self.inner_column_border:
+            center = ""
+
+        if not inner_widths:
+            lines.append(left + right)
+            return
+        if len(row) < len(inner_widths):
+            row = row + [""] * (len(inner_widths) - len(row))
+
+        pad_left = " " * self.padding_left
+        pad_right = " " * self.padding_right
+        cells = []
+        for column, cell in enumerate(row):
+            cell_lines = cell.splitlines() or [""]
+            if cell.endswith("\n"):
+                cell_lines.append("")
+            if height > len(cell_lines):
+                cell_lines += [""] * (height - len(cell_lines))
+
+            justify = self.justify_columns.get(column)
+            inner_width = inner_widths[column]
+            for index, line in enumerate(cell_lines):
+                new_width = inner_width + len(line) - visible_width(line)
+                if justify == "right":
+                    cell_lines[index] = line.rjust(self.padding_left + new_width) + pad_right
+                elif justify == "center":
+                    cell_lines[index] = pad_left + line.center(new_width) + pad_right
+                else:
+                    cell_lines[index] = pad_left + line.ljust(new_width + self.padding_right)
+            cells.append(cell_lines)
+
+        for line_index in range(len(cells[0])):
+            lines.append(left + center.join(cell[line_index] for cell in cells) + right)
+
+    def _border(self, style, outer_widths):
+        """Builds a horizontal border line, with the title overlaid on the top one."""
+        title = None
+        if style == "top":
+            horizontal = self.CHAR_OUTER_TOP_HORIZONTAL
+            left = self.CHAR_OUTER_TOP_LEFT
+            intersect = self.CHAR_OUTER_TOP_INTERSECT
+            right = self.CHAR_OUTER_TOP_RIGHT
+            title = self.title
+        elif style == "bottom":
+            horizontal = self.CHAR_OUTER_BOTTOM_HORIZONTAL
+            left = self.CHAR_OUTER_BOTTOM_LEFT
+            intersect = self.CHAR_OUTER_BOTTOM_INTERSECT
+            right = self.CHAR_OUTER_BOTTOM_RIGHT
+        else:
+            prefix = {"heading": "CHAR_H_", "footing": "CHAR_F_", "row": "CHAR_"}[style]
+            horizontal = getattr(self, f"{prefix}INNER_HORIZONTAL")
+            intersect = getattr(self, f"{prefix}INNER_INTERSECT")
+            left = getattr(self, f"{prefix}OUTER_LEFT_INTERSECT") if self.outer_border else ""
+            right = getattr(self, f"{prefix}OUTER_RIGHT_INTERSECT") if self.outer_border else ""
+        if not self.inner_column_border:
+            intersect = ""
+
+        # Titles are hidden if they don't fit between the corners
+        if title is not None and outer_widths:
+            title = str(title)
+            length = visible_width(title)
+            if length > sum(outer_widths) + len(intersect) * (len(outer_widths) - 1):
+                title = None
+        if title is None or not outer_widths or not horizontal:
+            return left + intersect.join(horizontal * width for width in outer_widths) + right
+
+        if length <= outer_widths[0]:
+            columns = [title + horizontal * (outer_widths[0] - length)]
+            columns += [horizontal * width for width in outer_widths[1:]]
+            return left + intersect.join(columns) + right
+
+        # Titles wider than the first column run over the following columns and intersects
+        parts = [title]
+        for index, width in enumerate(outer_widths):
+            for part in (True, width) if index and intersect else (width,):
+                if length < 1:
+                    parts.append(intersect if part is True else horizontal * part)
+                elif part is True:
+                    length -= 1
+                elif part >= length:
+                    parts[0] += horizontal * (part - length)
+                    length = 0
+                else:
+                    length -= part
+        return left + "".join(parts) + right
+
+
+# What NativeTable draws with instead. Classes changing any of these draw tables differently
+_DRAWING_METHODS = ("__init__", "gen_row_lines", "gen_table", "horizontal_border", "table")
+
+
+def native_table(table_class):
+    """Creates a `NativeTable` drawn with the border characters of a terminaltables3 class.
+
+    Only classes that differ from `AsciiTable` by their `CHAR_*` border characters can be copied,
+    like `SingleTable` and `DoubleTable`. Ones drawing tables their own way (eg
+    `GithubFlavoredMarkdownTable` or `PorcelainTable`) are rejected.
+
+    Args:
+        table_class (class): A terminaltables3 table class, eg `DoubleTable`.
+
+    Returns:
+        class: A `NativeTable` subclass rendering the same tables as `table_class`.
+
+    Raises:
+        TableTypeError: If `table_class` draws tables in a way `NativeTable` can't copy.
+    """
+    for name in _DRAWING_METHODS:
+        owner = next((base for base in table_class.__mro__ if name in vars(base)), None)
+        # UnixTable only joins escape sequences in the finished table, see `join_escapes`
+        if owner is not BaseTable and not (owner is UnixTable and name == "table"):
+            raise TableTypeError(
+                f"Can't create a native table from {table_class.__name__}, it overrides {name}"
+            )
+    chars = {name: getattr(table_class, name) for name in dir(table_class) if name[:5] == "CHAR_"}
+    chars["join_escapes"] = issubclass(table_class, UnixTable)
+    return type(f"Native{table_class.__name__}", (NativeTable,), chars)
+
+
+NativeAsciiTable = NativeTable
+NativeSingleTable = native_table(tt3.SingleTable)
+NativeDoubleTable = native_table(tt3.DoubleTable)
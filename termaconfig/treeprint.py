@@ -0,0 +1,91 @@
+# termaconfig/treeprint.py
+#
+# Draws nested dicts as trees, line by line. This is a fork of the tree layout of printree
+# (https://github.com/chrizzFTD/printree), so error trees look identical to `printree.ftree`
+# without building the whole string first. tests/test_errortree.py checks the output against
+# printree, so changes there should be ported here.
+#
+# printree is distributed under the MIT License:
+#
+# Copyright (c) 2020 chrizzftd
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+# Same characters printree uses
+TREE_ROOT = "┐"
+TREE_EDGE = "│   "
+TREE_BRANCH_NEXT = "├── "
+TREE_BRANCH_LAST = "└── "
+
+
+def iter_tree_lines(tree, root=TREE_ROOT):
+    """Yields the lines of a nested dict drawn as a tree, the same as `printree.ftree(tree)`.
+
+    Args:
+        tree (dict): The tree to draw. Mappings and other iterables become branches, everything
+            else is a leaf.
+        root (str, optional): What the root of the tree is drawn as.
+
+    Yields:
+        str: A single line of the tree, without a trailing newline.
+    """
+    for item in _tree_items(tree, root):
+        yield from item.split("\n")
+
+
+def _tree_items(obj, key, prefix="", last=False, level=0):
+    """Yields the branches of a nested dict as tree entries.
+
+    Mappings and other iterables become branches, everything else is a leaf. Multi-line keys
+    and string leaves are indented to line up under their branch.
+    """
+    sprout = level > 0
+    sprout_repr = ": " if sprout else ""
+    newlevel = "    " if last else TREE_EDGE
+    branch = prefix + (TREE_BRANCH_LAST if last else TREE_BRANCH_NEXT) if sprout else ""
+    key_repr = branch + _indent_following_lines(str(key), prefix + newlevel)
+
+    children = []
+    if isinstance(obj, (str, bytes)):
+        # Continuation lines of a string are padded to start after the "key: " part
+        last_line = key_repr.expandtabs().splitlines()[-1]
+        padding = len(last_line) + 2
+        item_repr = _indent_following_lines(
+            f"{sprout_repr}{obj}", f"{last_line[: len(prefix)] + newlevel:<{padding}}"
+        )
+    elif isinstance(obj, dict):
+        children = list(obj.items())
+        item_repr = ""
+    elif isinstance(obj, (list, tuple, set)):
+        children = list(enumerate(obj))
+        item_repr = ""
+    else:
+        item_repr = f"{sprout_repr}{obj}"
+
+    yield f"{key_repr}{item_repr}"
+    if sprout:
+        prefix += newlevel
+    for index, (child_key, child) in enumerate(children):
+        yield from _tree_items(child, child_key, prefix, index == len(children) - 1, level + 1)
+
+
+def _indent_following_lines(text, prefix):
+    """Adds a prefix to every line of a string except the first."""
+    lines = text.splitlines(keepends=True)
+    return "".join(lines[:1] + [prefix + line for line in lines[1:]])
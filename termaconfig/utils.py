@@ -1,26 +1,67 @@
 # termaconfig/utils.py
 
+import functools
+import mmap
+import re
+
 
 def preprocess_config(config_data):
     """Preprocesses configuration data by stripping quotes from values and trimming whitespace.
 
+    Lines are read one at a time (see `iter_config_lines`), so only the processed lines are held
+    in memory rather than the raw text as well.
+
     Args:
-        config_data (file-like object): The file-like object containing the raw configuration data.
+        config_data (str, file-like object, mmap or iterable): A path to a config file, an open
+            file, an mmap of one, or any iterable of lines.
 
     Returns:
         list: A list of modified lines with quotes stripped and whitespace trimmed.
     """
-    modified_lines = []
-    for line in config_data.read().split("\n"):
-        if "=" in line:
-            key, value = line.split("=", 1)
-            key = key.strip()
-            value = strip_quotes(value.strip())
-            modified_line = f"{key}={value}"
-            modified_lines.append(modified_line)
+    return list(iter_config_lines(config_data))
+
+
+def iter_config_lines(config_data):
+    """Lazily yields configuration lines with quotes stripped from values and whitespace trimmed.
+
+    Args:
+        config_data (str, file-like object, mmap or iterable): A path to a config file (which is
+            opened and closed here), an open file, an mmap of one, or any iterable of lines.
+            Lines can be str or utf-8 bytes, with or without line endings.
+
+    Yields:
+        str: Each modified line, without its line ending.
+    """
+    if isinstance(config_data, str):
+        with open(config_data, "r") as config_file:
+            yield from iter_config_lines(config_file)
+        return
+    if isinstance(config_data, mmap.mmap):
+        config_data = iter(config_data.readline, b"")
+
+    for line in config_data:
+        if isinstance(line, bytes):
+            line = line.decode("utf-8")
+        line = line.rstrip("\r\n")
+        if "=" not in line:
+            yield line
+            continue
+        key, _, value = line.partition("=")
+        key = key.strip()
+        value = strip_quotes(value.strip())
+        # Lines that are already clean are passed on as they are instead of being rebuilt
+        if len(key) + len(value) + 1 == len(line):
+            yield line
         else:
-            modified_lines.append(line)
-    return modified_lines
+            yield f"{key}={value}"
+
+
+@functools.lru_cache(maxsize=4096)
+def _sanitize_text(input_str):
+    # Normalizes formatting, such as escaped newline codes, ect.
+    sanitized_str = input_str.encode("latin-1", "backslashreplace").decode("unicode-escape")
+    # Remove any surrounding quotes
+    return sanitized_str.strip('"').strip("'")
 
 
 def get_nested_value(dictionary, keys):
@@ -39,6 +80,28 @@ def get_nested_value(dictionary, keys):
     return dictionary
 
 
+def error_budget(max_errors=None, fail_fast=False):
+    """Works out how many errors to collect before stopping.
+
+    Args:
+        max_errors (int, optional): Stop after this many errors.
+        fail_fast (bool, optional): Stop after the first error, same as `max_errors=1`.
+
+    Returns:
+        int: The number of errors to stop at, or None to collect every error.
+
+    Raises:
+        ValueError: If max_errors isn't a positive integer.
+    """
+    budget = 1 if fail_fast else max_errors
+    # bool is an int subclass, but max_errors=True is almost certainly a mistake
+    if budget is not None and (
+        not isinstance(budget, int) or isinstance(budget, bool) or budget < 1
+    ):
+        raise ValueError(f"Expected max_errors to be a positive integer, got: {budget}")
+    return budget
+
+
 def sanitize_str(input_data):
     """Sanitizes a given input by converting it into a consistent, easy to read string.
 
@@ -58,11 +121,10 @@ def sanitize_str(input_data):
         ValueError: If the input data is of an unsupported type.
     """
     if isinstance(input_data, str):
-        # Normalizes formatting, such as escaped newline codes, ect.
-        sanitized_str = input_data.encode("latin-1", "backslashreplace").decode("unicode-escape")
-        # Remove any surrounding quotes
-        sanitized_str = sanitized_str.strip('"').strip("'")
-        return sanitized_str
+        # Without escapes or quotes there's nothing to change, which is most values
+        if "\\" not in input_data and '"' not in input_data and "'" not in input_data:
+            return input_data
+        return _sanitize_text(input_data)
     elif isinstance(input_data, list):
         # Convert list to a string with each element separated by ', '
         return ", ".join(map(sanitize_str, input_data))
@@ -100,6 +162,18 @@ def join_wrapped_list(items, entries_per_line):
     return "\n".join(result)
 
 
+def parse_header(header_value):
+    """Splits a `__header` metakey value into a list of sanitized column names.
+
+    Args:
+        header_value (str): Comma separated column names, eg `'Option', 'Value'`.
+
+    Returns:
+        list: Up to three column names for the table header row.
+    """
+    return [sanitize_str(item.strip()) for item in header_value.split(",")]
+
+
 def strip_quotes(input_string):
     """Strips leading and trailing quotes from a string if they are the same type (single or double).
 
@@ -158,15 +232,60 @@ def split_dot_notated_keys(input_dict, container_key=None):
     return result
 
 
+def iter_sections(input_dict, keys=None):
+    """Yields every section of a nested dict with its dot-notated path, parents first.
+
+    Unlike `flatten_sections`, nothing is copied. The root section has an empty path.
+
+    Yields:
+        tuple: `(path, section)` for every section in the input.
+    """
+    if keys is None:
+        keys = []
+    yield ".".join(keys), input_dict
+    for key, value in input_dict.items():
+        if isinstance(value, dict):
+            yield from iter_sections(value, keys + [key])
+
+
+def flatten_sections(input_dict, keys=None, result=None):
+    """Flattens nested sections into a dict keyed by their dot-notated paths.
+
+    Each entry only holds the section's own values, without subsections. The root section
+    is stored under an empty string.
+
+    Args:
+        input_dict (dict): A loaded config or other nested dict.
+
+    Returns:
+        dict: `{path: {key: value}}` for every section in the input.
+    """
+    if keys is None:
+        keys = []
+    if result is None:
+        result = {}
+
+    values = {}
+    result[".".join(keys)] = values
+    for key, value in input_dict.items():
+        if isinstance(value, dict):
+            flatten_sections(value, keys + [key], result)
+        else:
+            values[key] = value
+
+    return result
+
+
 def strip_metakeys(input_dict, delimiter):
-    """Takes an input config dict and removes keys with the delimiter in them. Use the returned spec to run validation on."""
+    """Takes an input config dict and removes keys with the delimiter in them. Use the returned spec to run validation on.
+
+    Sections are kept even when only metakeys were in them, so validation still creates them.
+    """
     stripped_spec = {}
     for key, value in input_dict.items():
         if delimiter not in key:
             if isinstance(value, dict):
-                new_value = strip_metakeys(value, delimiter)
-                if new_value:
-                    stripped_spec[key] = new_value
+                stripped_spec[key] = strip_metakeys(value, delimiter)
             else:
                 stripped_spec[key] = value
     return stripped_spec
@@ -211,9 +330,18 @@ def remove_true_keys(input_dict):
     return result
 
 
+# Characters that matter when splitting a check string. Everything between them is skipped over
+_CHECK_TOKENS = re.compile(r"[(),=\"']")
+
+
+@functools.lru_cache(maxsize=4096)
 def parse_string_values(input_str):
     """Extracts and returns a dict object from a string formatted as '{any string}(key1=value1,key2=value2,...)'.
 
+    The arguments are split in a single pass, so values can contain any nested brackets (eg
+    `default=list('a', 'b')`) and quoted commas or equal signs. Results are cached by string, so
+    the returned dict is shared between calls and shouldn't be modified.
+
     Args:
         input_str (str): A string containing key-value pairs separated by commas.
             The string should be in the format `{any string}(key1=value1,key2=value2,...)`.
@@ -225,45 +353,52 @@ def parse_string_values(input_str):
     Raises:
         ValueError: If the input string format is incorrect or if there are invalid key-value pairs.
     """
-    try:
-        index = input_str.index("(")
-    except ValueError:
+    index = input_str.find("(")
+    if index == -1:
         return input_str, None
 
     parent_key = input_str[:index]
-    # Get second half (value) of the str. Also trim off the trailing bracket
-    tuple = input_str[index + 1 :][:-1]
-
-    # Handle nested tuple-like objects
-    open_bracket_index = tuple.find("(")
-    if open_bracket_index != -1:
-        close_bracket_index = tuple.find(")", open_bracket_index + 1)
-        if close_bracket_index == -1:
-            raise ValueError(f"{input_str} is not valid: Opening bracket with no closer")
-        sub_list = tuple[open_bracket_index + 1 : close_bracket_index]
-        # Temporarily swap out commas for double semicolon so the list as treated as once item
-        new_sub_list = sub_list.replace(",", ";;")
-        tuple = tuple.replace(sub_list, new_sub_list)
-
-    items = tuple.split(",")
     value_dict = {}
-    for idx, item in enumerate(items):
-        item = strip_quotes(item.strip())
-
-        item_parts = item.split("=")
-        # Items with no values
-        if len(item_parts) == 1:
-            key = item_parts[0].strip()
-            val = None
-        # Items longer than two (key=value) are invalid
-        elif len(item_parts) != 2:
-            raise ValueError(f"Invalid key-value pair format: {item_parts}")
-        # Regular key=value pairs
-        else:
-            key, val = item_parts
-            key = key.strip()
-            val = val.strip().strip('"').replace(";;", ",")
-
-        value_dict[key] = val
-
-    return parent_key, value_dict
+    depth = 0
+    quote = None
+    # Start of the current item, and where its top-level equal sign is (if any)
+    item_start = index + 1
+    equals = None
+    for match in _CHECK_TOKENS.finditer(input_str, index + 1):
+        char = match.group()
+        pos = match.start()
+        if quote:
+            if char == quote:
+                quote = None
+        elif char in "\"'":
+            quote = char
+        elif char == "(":
+            depth += 1
+        elif depth == 0 and char in ",)":
+            _add_check_item(value_dict, input_str[item_start:pos], equals, item_start, input_str)
+            if char == ")":
+                if input_str[pos + 1 :].strip():
+                    raise ValueError(f"{input_str} is not valid: Text after closing bracket")
+                return parent_key, value_dict
+            item_start = pos + 1
+            equals = None
+        elif char == ")":
+            depth -= 1
+        elif char == "=" and depth == 0:
+            if equals is not None:
+                raise ValueError(f"Invalid key-value pair format: {input_str[item_start:pos]}")
+            equals = pos
+
+    raise ValueError(f"{input_str} is not valid: Opening bracket with no closer")
+
+
+def _add_check_item(value_dict, item, equals, item_start, input_str):
+    """Adds one `key=value` or valueless argument of a check string to `value_dict`."""
+    if equals is None:
+        key = strip_quotes(item.strip()).strip()
+        # Nothing between commas or brackets, eg `string()`
+        if key:
+            value_dict[key] = None
+        return
+    key = input_str[item_start:equals].strip()
+    value_dict[key] = item[equals - item_start + 1 :].strip().strip('"')
@@ -0,0 +1,4 @@
+# termaconfig/version.py
+
+# Kept in its own module so submodules can read it without importing the package
+__version__ = "1.0.1"
@@ -0,0 +1,50 @@
+# tests/test_async.py
+
+import asyncio
+import shutil
+
+import pytest
+from terminaltables3 import AsciiTable
+
+import termaconfig as tc
+
+CONFIG_PATH_1 = 'tests/valid-configs/example-config.toml'
+SPEC_PATH_1 = 'tests/valid-configs/example-spec.toml'
+
+def test_aload(capsys):
+    spec = tc.CompiledSpec(SPEC_PATH_1)
+
+    async def load_all():
+        return await asyncio.gather(
+            *(tc.TermaConfig.aload(CONFIG_PATH_1, spec, tabletype=AsciiTable) for _ in range(4))
+        )
+
+    configs = asyncio.run(load_all())
+    fresh = tc.TermaConfig(CONFIG_PATH_1, SPEC_PATH_1, tabletype=AsciiTable, output=None)
+
+    assert all(config.metaconf == fresh.metaconf for config in configs)
+    assert configs[0]['basic']['other']['port'] == 3021
+    # Nothing should be printed by default
+    assert capsys.readouterr().out == ''
+
+def break_config(config_path):
+    with open(config_path) as f:
+        config_str = f.read().replace('port = 3021', 'port = 4')
+    with open(config_path, 'w') as f:
+        f.write(config_str)
+
+def test_areload_invalid(tmp_path):
+    config_path = str(tmp_path / 'config.toml')
+    shutil.copy(CONFIG_PATH_1, config_path)
+
+    async def load_and_reload():
+        config = await tc.TermaConfig.aload(config_path, SPEC_PATH_1)
+        # Keep blocking file IO off the event loop
+        await asyncio.get_running_loop().run_in_executor(None, break_config, config_path)
+        await config.areload()
+
+    with pytest.raises(tc.ConfigValidationError):
+        asyncio.run(load_and_reload())
+
+if __name__ == '__main__':
+    pytest.main()
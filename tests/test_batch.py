@@ -0,0 +1,47 @@
+# tests/test_batch.py
+
+import pytest
+from terminaltables3 import AsciiTable
+
+import termaconfig as tc
+
+CONFIG_PATH_1 = 'tests/valid-configs/example-config.toml'
+SPEC_PATH_1 = 'tests/valid-configs/example-spec.toml'
+
+def make_paths(tmp_path):
+    invalid_path = tmp_path / 'invalid.toml'
+    with open(CONFIG_PATH_1) as f:
+        invalid_path.write_text(f.read().replace('port = 3021', 'port = 4'))
+    return [CONFIG_PATH_1, str(invalid_path), str(tmp_path / 'nonexistent.toml')]
+
+def test_validate_many(tmp_path):
+    paths = make_paths(tmp_path)
+    results = tc.validate_many(paths, SPEC_PATH_1, workers=1, render=True, tabletype=AsciiTable)
+
+    valid, invalid, unreadable = results
+    assert [result.path for result in results] == paths
+
+    assert valid.valid and valid.errors == {} and valid.exception is None
+    fresh = tc.TermaConfig(CONFIG_PATH_1, SPEC_PATH_1, tabletype=AsciiTable, output=None)
+    assert valid.tables == fresh.config_tables.all_tables
+
+    assert not invalid.valid
+    assert list(invalid.errors) == ['basic.other.port']
+    assert 'basic.other.port' not in invalid.error_tree and 'port' in invalid.error_tree
+    assert invalid.tables is None
+
+    assert not unreadable.valid
+    assert unreadable.exception.startswith('FileNotFoundError')
+
+def test_validate_many_pool(tmp_path):
+    paths = make_paths(tmp_path) * 4
+    serial = tc.validate_many(paths, SPEC_PATH_1, workers=1)
+    pooled = tc.validate_many(paths, tc.CompiledSpec(SPEC_PATH_1), workers=2)
+
+    def summary(results):
+        return [(r.path, r.valid, r.errors, r.exception) for r in results]
+
+    assert summary(serial) == summary(pooled)
+
+if __name__ == '__main__':
+    pytest.main()
@@ -0,0 +1,94 @@
+# tests/test_errortree.py
+
+import io
+
+import pytest
+from configobj import ConfigObj
+from printree import ftree
+
+import termaconfig as tc
+
+from tests.utils import TermaConfigTests
+
+CONFIG_PATH_1 = 'tests/valid-configs/example-config.toml'
+SPEC_PATH_1 = 'tests/valid-configs/example-spec.toml'
+
+def test_tree_lines_match_printree():
+    instance = TermaConfigTests(CONFIG_PATH_1, SPEC_PATH_1)
+    errortree = tc.ErrorTree(instance.metaconf, include_valid=True)
+
+    assert errortree.get_tree == ftree(errortree.tree)
+
+    # Multi-line keys and values get indented the same way
+    errortree.tree['info']['name'] = 'first line\nsecond line'
+    errortree.tree['info']['multi\nline'] = {'key': 'value'}
+    assert list(errortree.iter_tree_lines()) == ftree(errortree.tree).split('\n')
+
+def test_tree_nesting():
+    instance = TermaConfigTests(CONFIG_PATH_1, SPEC_PATH_1)
+    metaconf_keys = {entry: list(details) for entry, details in instance.metaconf.items()}
+    errortree = tc.ErrorTree(instance.metaconf, include_valid=True)
+
+    # Child sections come after the parent's own options
+    assert list(errortree.tree['basic']) == ['enabled', 'option1', 'option2', 'other']
+    assert errortree.tree['basic']['other'] == {'port': 'Valid', 'ip': 'Valid'}
+
+    # metaconf is left alone
+    assert {entry: list(details) for entry, details in instance.metaconf.items()} == metaconf_keys
+
+def test_tree_from_results():
+    spec = tc.CompiledSpec(SPEC_PATH_1)
+    config = ConfigObj(['[basic]', '[[other]]', 'port = 4'], configspec=spec.configspec)
+    result = config.validate(spec.validator, preserve_errors=True)
+    errortree = tc.ErrorTree.from_results(result, spec, config=config)
+
+    # Only the branches leading to errors are there
+    assert not errortree.valid and errortree.error_count == 2
+    assert list(errortree.tree) == ['basic']
+    assert list(errortree.tree['basic']['other']) == ['port', 'ip']
+    full_tree = tc.ErrorTree(tc.ConfigParser(config, spec, result).metaconf)
+    assert errortree.tree['basic']['other'] == full_tree.tree['basic']['other']
+
+    without_missing = tc.ErrorTree.from_results(result, spec, include_missing=False)
+    assert list(without_missing.tree['basic']['other']) == ['port']
+    with pytest.raises(ValueError):
+        tc.ErrorTree.from_results(result, spec, include_valid=True)
+
+def test_error_budget():
+    spec = tc.CompiledSpec(SPEC_PATH_1)
+    config = ConfigObj(['[basic]', '[[other]]', 'port = 4', '[advanced]', 'enabled = maybe'],
+                       configspec=spec.configspec)
+    result = config.validate(spec.validator, preserve_errors=True)
+    metaconf = tc.ConfigParser(config, spec, result).metaconf
+
+    for errortree in (tc.ErrorTree(metaconf, fail_fast=True),
+                      tc.ErrorTree.from_results(result, spec, config=config, fail_fast=True)):
+        assert not errortree.valid and errortree.truncated
+        assert errortree.error_count == 1 and errortree.unchecked_sections == 3
+        assert list(errortree.tree['basic']['other']) == ['port']
+        assert errortree.tree['…'] == 'Stopped after 1 error, 3 sections not checked'
+
+    # Nothing is cut off when the budget is enough
+    errortree = tc.ErrorTree(metaconf, max_errors=10)
+    assert not errortree.truncated and errortree.error_count == 3
+    with pytest.raises(ValueError):
+        tc.ErrorTree(metaconf, max_errors=0)
+    with pytest.raises(ValueError):
+        tc.ErrorTree(metaconf, max_errors=True)
+
+    # Eager loading keeps the full tree, lazy loading only finds the errors
+    expected = {
+        'eager': list(tc.ErrorTree(metaconf, max_errors=2).iter_tree_lines()),
+        'lazy': list(tc.ErrorTree.from_results(result, spec, config=config, max_errors=2).iter_tree_lines()),
+    }
+    assert expected['eager'][-1] == '└── …: Stopped after 2 errors, 3 sections not checked'
+    assert expected['lazy'][-1] == '└── …: Stopped after 2 errors, 2 sections not checked'
+    for render, tree_lines in expected.items():
+        lines = []
+        with pytest.raises(tc.ConfigValidationError):
+            tc.TermaConfig(io.StringIO('\n'.join(config.write())), spec, output=lines.append, max_errors=2,
+                           render=render)
+        assert lines == tree_lines
+
+if __name__ == '__main__':
+    pytest.main()
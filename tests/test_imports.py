@@ -0,0 +1,27 @@
+# tests/test_imports.py
+
+import subprocess
+import sys
+
+import pytest
+
+import termaconfig as tc
+
+def test_lazy_imports():
+    # Rendering, batch and asyncio dependencies aren't imported with the package
+    heavy = ['asyncio', 'concurrent.futures', 'terminaltables3', 'termaconfig.configtables',
+             'termaconfig.errortree', 'termaconfig.batch', 'termaconfig.tables', 'termaconfig.structured']
+    code = f'import sys, termaconfig; print([m for m in {heavy!r} if m in sys.modules])'
+    result = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True, check=True)
+    assert result.stdout.strip() == '[]'
+
+    # They're still available from the package root
+    from termaconfig.configtables import ConfigTables
+    assert tc.ConfigTables is ConfigTables
+    assert 'NativeSingleTable' in dir(tc)
+    with pytest.raises(AttributeError):
+        getattr(tc, 'NotAThing')
+
+
+if __name__ == '__main__':
+    pytest.main()
@@ -0,0 +1,35 @@
+# tests/test_preprocess.py
+
+import gc
+import mmap
+import warnings
+
+import termaconfig as tc
+from termaconfig.utils import iter_config_lines
+
+CONFIG_PATH_1 = 'tests/valid-configs/example-config.toml'
+SPEC_PATH_1 = 'tests/valid-configs/example-spec.toml'
+
+def test_preprocess_sources():
+    with open(CONFIG_PATH_1) as f:
+        expected = tc.preprocess_config(f)
+    assert 'name=termaconfig' in expected and 'port=3021' in expected
+
+    assert tc.preprocess_config(CONFIG_PATH_1) == expected
+    with open(CONFIG_PATH_1, 'rb') as f:
+        assert tc.preprocess_config(f) == expected
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            assert tc.preprocess_config(mapped) == expected
+
+    lines = iter_config_lines(['[a]\n', b'  key =  "value"  \r\n', 'plain=1'])
+    assert next(lines) == '[a]'
+    assert list(lines) == ['key=value', 'plain=1']
+
+def test_files_closed():
+    with warnings.catch_warnings(record=True) as caught:
+        warnings.simplefilter('always', ResourceWarning)
+        config = tc.TermaConfig(CONFIG_PATH_1, SPEC_PATH_1, output=None)
+        config.reload()
+        del config
+        gc.collect()
+    assert not [w for w in caught if issubclass(w.category, ResourceWarning)]
@@ -0,0 +1,140 @@
+# tests/test_reload.py
+
+import shutil
+
+import pytest
+from terminaltables3 import AsciiTable
+
+import termaconfig as tc
+
+CONFIG_PATH_1 = 'tests/valid-configs/example-config.toml'
+SPEC_PATH_1 = 'tests/valid-configs/example-spec.toml'
+
+def test_reload_matches_fresh_load(tmp_path):
+    config_path = str(tmp_path / 'config.toml')
+    shutil.copy(CONFIG_PATH_1, config_path)
+    config = tc.TermaConfig(config_path, SPEC_PATH_1, tabletype=AsciiTable)
+
+    # Nothing changed yet
+    assert config.reload() == []
+
+    with open(config_path) as f:
+        config_str = f.read()
+    config_str = config_str.replace('port = 3021', 'port = 4000')
+    config_str = config_str.replace('enabled = true\noption1', 'enabled = false\noption1')
+    with open(config_path, 'w') as f:
+        f.write(config_str)
+
+    assert config.reload() == ['basic', 'basic.other']
+    assert config['basic']['other']['port'] == 4000
+
+    # basic.other is toggled off by basic.enabled, which should be picked up
+    fresh = tc.TermaConfig(config_path, SPEC_PATH_1, tabletype=AsciiTable)
+    assert config.metaconf == fresh.metaconf
+    assert config.tabledata == fresh.tabledata
+
+def test_reload_keeps_file_order(tmp_path):
+    config_path = str(tmp_path / 'config.toml')
+    shutil.copy(CONFIG_PATH_1, config_path)
+    config = tc.TermaConfig(config_path, SPEC_PATH_1, tabletype=AsciiTable)
+
+    with open(config_path) as f:
+        config_str = f.read().replace('item1 =', 'newitem = "x"\nitem1 =')
+    with open(config_path, 'w') as f:
+        f.write(config_str)
+
+    assert config.reload() == ['advanced.items']
+    assert list(config['advanced']['items'])[:2] == ['newitem', 'item1']
+
+    fresh = tc.TermaConfig(config_path, SPEC_PATH_1, tabletype=AsciiTable)
+    assert config.tabledata['advanced']['tablestr'] == fresh.tabledata['advanced']['tablestr']
+
+def test_reload_removed_sections(tmp_path):
+    config_path = str(tmp_path / 'config.toml')
+    with open(CONFIG_PATH_1) as f:
+        config_str = f.read()
+    with open(config_path, 'w') as f:
+        f.write(config_str + '\n[unknown]\nkey = 1\n[[nested]]\nkey = 2\n')
+    config = tc.TermaConfig(config_path, SPEC_PATH_1, tabletype=AsciiTable)
+    assert config['unknown']['nested']['key'] == '2'
+
+    with open(config_path, 'w') as f:
+        f.write(config_str)
+
+    assert config.reload() == ['unknown', 'unknown.nested']
+    assert 'unknown' not in config
+
+    fresh = tc.TermaConfig(config_path, SPEC_PATH_1, tabletype=AsciiTable)
+    assert config.dict() == fresh.dict()
+    assert config.metaconf == fresh.metaconf
+
+def test_reload_untracked(tmp_path):
+    config_path = str(tmp_path / 'config.toml')
+    shutil.copy(CONFIG_PATH_1, config_path)
+    config = tc.TermaConfig(config_path, SPEC_PATH_1, tabletype=AsciiTable, track_changes=False)
+    assert config.raw_sections is None
+
+    with open(config_path) as f:
+        config_str = f.read().replace('port = 3021', 'port = 4000')
+    with open(config_path, 'w') as f:
+        f.write(config_str)
+
+    # Without anything to compare against, the first reload can't tell what changed
+    assert config.reload() is None
+    assert config.reload() == []
+
+    fresh = tc.TermaConfig(config_path, SPEC_PATH_1, tabletype=AsciiTable)
+    assert config.dict() == fresh.dict()
+    assert config.metaconf == fresh.metaconf
+    assert config.tabledata == fresh.tabledata
+
+def test_reload_invalid(tmp_path):
+    config_path = str(tmp_path / 'config.toml')
+    shutil.copy(CONFIG_PATH_1, config_path)
+    config = tc.TermaConfig(config_path, SPEC_PATH_1, tabletype=AsciiTable)
+
+    with open(config_path) as f:
+        config_str = f.read().replace('port = 3021', 'port = 4')
+    with open(config_path, 'w') as f:
+        f.write(config_str)
+
+    with pytest.raises(tc.ConfigValidationError):
+        config.reload()
+
+def test_reload_invalid_keeps_state(tmp_path):
+    config_path = str(tmp_path / 'config.toml')
+    with open(CONFIG_PATH_1) as f:
+        original = f.read()
+    with open(config_path, 'w') as f:
+        f.write(original + '\n[unknown]\nkey = 1\n')
+
+    for render in ('eager', 'lazy'):
+        config = tc.TermaConfig(config_path, SPEC_PATH_1, tabletype=AsciiTable, output=None, render=render)
+        before = config.dict()
+        if render == 'eager':
+            metaconf = {path: dict(section) for path, section in config.metaconf.items()}
+
+        # Invalid value, new key order, a new section and a removed one all at once
+        with open(config_path, 'w') as f:
+            f.write(original.replace('port = 3021', 'port = notanint')
+                    .replace('item1 =', 'newitem = "x"\nitem1 =') + '\n[added]\nkey = 2\n')
+        for _ in range(2):
+            # Failed reloads leave everything as it was, and keep failing until fixed
+            with pytest.raises(tc.ConfigValidationError):
+                config.reload()
+            assert config['basic']['other']['port'] == 3021
+            assert config.dict() == before
+            assert list(config['advanced']['items'])[0] == 'item1'
+
+        if render == 'eager':
+            assert {path: dict(section) for path, section in config.metaconf.items()} == metaconf
+        else:
+            assert config._parser is None
+        assert config.errortree.valid
+
+        with open(config_path, 'w') as f:
+            f.write(original + '\n[unknown]\nkey = 1\n')
+        assert config.reload() == []
+
+if __name__ == '__main__':
+    pytest.main()
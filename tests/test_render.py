@@ -0,0 +1,60 @@
+# tests/test_render.py
+
+import io
+import shutil
+
+import pytest
+from terminaltables3 import AsciiTable
+
+import termaconfig as tc
+
+CONFIG_PATH_1 = 'tests/valid-configs/example-config.toml'
+SPEC_PATH_1 = 'tests/valid-configs/example-spec.toml'
+
+def test_lazy_rendering():
+    lines = []
+    config = tc.TermaConfig(
+        CONFIG_PATH_1, SPEC_PATH_1, tabletype=AsciiTable, output=lines.append, render='lazy', stats=True
+    )
+
+    # Only the values are loaded up front, and nothing is printed
+    assert list(config.stats.stages) == ['spec', 'preprocess', 'parse', 'validate', 'errortree']
+    assert lines == []
+    assert config['basic']['other']['port'] == 3021
+
+    eager = tc.TermaConfig(CONFIG_PATH_1, SPEC_PATH_1, tabletype=AsciiTable, output=None)
+    assert config.tabledata == eager.tabledata
+    assert list(config.stats.stages)[5:] == ['parser', 'tables']
+    assert config.metaconf == eager.metaconf
+    assert config.errortree.valid
+
+def test_never_rendering():
+    config = tc.TermaConfig(CONFIG_PATH_1, SPEC_PATH_1, output=None, render='never')
+    assert config.config_tables is None
+    assert config.tabledata is None
+    assert config.index.get('basic.other.port')['value'] == '3021'
+
+    with pytest.raises(ValueError):
+        tc.TermaConfig(CONFIG_PATH_1, SPEC_PATH_1, output=None, render='sometimes')
+
+def test_lazy_rendering_errors(tmp_path):
+    lines = []
+    invalid = io.StringIO('[basic]\n[[other]]\nport = 4\n')
+    with pytest.raises(tc.ConfigValidationError):
+        tc.TermaConfig(invalid, SPEC_PATH_1, output=lines.append, render='lazy')
+    assert any('port' in line for line in lines)
+
+    config_path = str(tmp_path / 'config.toml')
+    shutil.copy(CONFIG_PATH_1, config_path)
+    config = tc.TermaConfig(config_path, SPEC_PATH_1, output=None, render='lazy')
+    with open(config_path) as f:
+        config_str = f.read().replace('port = 3021', 'port = 4')
+    with open(config_path, 'w') as f:
+        f.write(config_str)
+
+    with pytest.raises(tc.ConfigValidationError):
+        config.reload()
+
+
+if __name__ == '__main__':
+    pytest.main()
@@ -0,0 +1,152 @@
+# tests/test_spec.py
+
+import io
+import json
+
+import pytest
+from configobj import ConfigObj
+from terminaltables3 import AsciiTable
+
+import termaconfig as tc
+
+from tests.utils import TermaConfigTests
+
+CONFIG_PATH_1 = 'tests/valid-configs/example-config.toml'
+SPEC_PATH_1 = 'tests/valid-configs/example-spec.toml'
+
+def test_compiled_spec_matches_dict_spec():
+    instance = TermaConfigTests(CONFIG_PATH_1, SPEC_PATH_1)
+    spec = tc.CompiledSpec(SPEC_PATH_1)
+
+    parser = tc.ConfigParser(instance, spec, instance.result)
+    assert parser.metaconf == instance.metaconf
+
+    # Pre-parsed values should be there without a config
+    port = spec.sections['basic.other']['params']['port']
+    assert port['type'] == 'integer'
+    assert port['min'] == '1024'
+    assert port['default'] == '1234'
+    assert spec.headers['basic'] == ['Option', 'Value']
+
+def test_compiled_spec_reuse():
+    spec = tc.CompiledSpec(SPEC_PATH_1)
+
+    first = tc.TermaConfig(CONFIG_PATH_1, spec, tabletype=AsciiTable)
+    second = tc.TermaConfig(CONFIG_PATH_1, spec, tabletype=AsciiTable)
+
+    assert first.metaconf == second.metaconf
+    assert first.tabledata == second.tabledata
+
+def test_path_index():
+    instance = TermaConfigTests(CONFIG_PATH_1, SPEC_PATH_1)
+    parser = tc.ConfigParser(instance, instance.configspec, instance.result)
+
+    assert parser.get('basic.other') is parser.metaconf['basic.other']
+    assert parser.get('basic.other.port')['value'] == '3021'
+    assert parser.index.children['basic'] == ['basic.other']
+    assert parser.index.parents['advanced.items'] == 'advanced'
+    with pytest.raises(KeyError):
+        parser.get('basic.nothing')
+
+def test_compiled_spec_cache(tmp_path):
+    first = tc.CompiledSpec(SPEC_PATH_1, cache_dir=str(tmp_path))
+    second = tc.CompiledSpec(SPEC_PATH_1, cache_dir=str(tmp_path))
+
+    assert first.cached is False
+    assert second.cached is True
+    assert first.sections == second.sections
+    assert first.configspec == second.configspec
+
+    # A different delimiter is a different compiled spec
+    third = tc.CompiledSpec(SPEC_PATH_1, cache_dir=str(tmp_path), delimiter='--')
+    assert third.cached is False
+
+    # Broken cache entries are recompiled instead of raising
+    for cache_file in tmp_path.iterdir():
+        cache_file.write_bytes(b'not a cache file')
+    fourth = tc.CompiledSpec(SPEC_PATH_1, cache_dir=str(tmp_path))
+    assert fourth.cached is False
+    assert fourth.sections == first.sections
+
+def test_iter_failures():
+    spec = tc.CompiledSpec(io.StringIO('\n'.join([
+        '[a]', 'x = integer', 'note__title = "Note"',
+        '[[b]]', 'y = integer', 'other__title = "Other"',
+        '[c]', 'z = integer',
+    ])))
+    # Options with only metakeys are listed up front, so valid subtrees aren't walked for them
+    assert spec.sections['a']['metakey_params'] == ['note']
+    assert spec.sections['a']['metakey_sections'] == ['a', 'a.b']
+    assert spec.sections['c']['metakey_sections'] == []
+
+    config = ConfigObj(['[a]', 'x = 1', '[[b]]', 'y = 2', '[c]', 'z = nope'], configspec=spec.validation_spec)
+    result = config.validate(spec.validator, preserve_errors=True)
+    assert result['a'] is True
+    failures = list(spec.iter_failures(result, config))
+    assert [(path, key, value is False) for path, key, value in failures] == [
+        ('a', 'note', True), ('a.b', 'other', True), ('c', 'z', False)
+    ]
+    assert [(path, key) for path, key, _ in spec.iter_failures(result)] == [('c', 'z')]
+
+    config['a']['note'] = 'here'
+    assert [(path, key) for path, key, _ in spec.iter_failures(result, config)][:1] == [('a.b', 'other')]
+
+def test_metaconf_records():
+    instance = TermaConfigTests(CONFIG_PATH_1, SPEC_PATH_1)
+    section = instance.metaconf['basic.other']
+    port = section['data']['port']
+
+    assert isinstance(section, tc.SectionMeta)
+    assert isinstance(port, tc.ParamMeta)
+    # Records should read and compare just like the dicts they replace
+    assert dict(port) == port
+    assert port.get('type') == port['type'] == 'integer'
+    assert 'value' in port and 'nonexistent' not in port
+
+    port['custom'] = 'extra'
+    assert port['custom'] == 'extra'
+    assert list(port)[-1] == 'custom'
+
+    # ...and support the rest of the dict API
+    copied = port.copy()
+    assert isinstance(copied, tc.ParamMeta) and copied == port and copied is not port
+    assert copied.pop('custom') == 'extra' and 'custom' not in copied and 'custom' in port
+    assert copied.pop('note') is None and 'note' not in copied
+    assert copied.setdefault('note', 'Note') == 'Note'
+    copied.update(title='Port')
+    assert (copied | {'title': 'Other'})['title'] == 'Other' and copied['title'] == 'Port'
+    assert ({'title': 'Other'} | copied)['title'] == 'Port'
+    copied.clear()
+    assert len(copied) == 0 and copied == {}
+
+    # Entries aren't dicts, so JSON needs the default hook
+    metaconf = json.loads(json.dumps(instance.metaconf, default=tc.records.json_default))
+    assert metaconf['basic.other']['data']['port']['type'] == 'integer'
+    plain = tc.records.metaconf_as_dict(instance.metaconf)
+    assert type(plain['basic.other']) is dict and type(plain['basic.other']['data']['port']) is dict
+    assert plain == metaconf and json.loads(json.dumps(plain)) == metaconf
+
+def test_parse_check_string():
+    parse = tc.utils.parse_string_values
+    assert parse('integer(min=1024, default=1234)') == ('integer', {'min': '1024', 'default': '1234'})
+    assert parse('ip_addr') == ('ip_addr', None)
+    # Nested brackets and quoted commas stay in their value
+    assert parse("list(default=list('a,b', list(1, 2)), max=3)") == (
+        'list', {'default': "list('a,b', list(1, 2))", 'max': '3'}
+    )
+    assert parse("string(default='a=b, c')")[1] == {'default': "'a=b, c'"}
+    assert parse('integer(0, 100)')[1] == {'0': None, '100': None}
+    # Repeated check strings are only parsed once
+    assert parse('integer(min=1, max=10)') is parse('integer(min=1, max=10)')
+
+    with pytest.raises(ValueError):
+        parse('integer(min=1')
+
+def test_sanitize_str():
+    plain = 'no escapes here'
+    assert tc.utils.sanitize_str(plain) is plain
+    assert tc.utils.sanitize_str('"line\\nbreak"') == 'line\nbreak'
+    assert tc.utils.sanitize_str(["'a'", 1, 'b']) == 'a, 1, b'
+
+if __name__ == '__main__':
+    pytest.main()
@@ -0,0 +1,57 @@
+# tests/test_stats.py
+
+import io
+
+import pytest
+from terminaltables3 import AsciiTable
+
+import termaconfig as tc
+
+CONFIG_PATH_1 = 'tests/valid-configs/example-config.toml'
+SPEC_PATH_1 = 'tests/valid-configs/example-spec.toml'
+
+def test_stats_disabled_by_default():
+    config = tc.TermaConfig(CONFIG_PATH_1, SPEC_PATH_1, tabletype=AsciiTable, output=None)
+    assert config.stats.stages == {}
+
+def test_stage_stats_and_hook():
+    events = []
+    config = tc.TermaConfig(
+        CONFIG_PATH_1,
+        SPEC_PATH_1,
+        tabletype=AsciiTable,
+        output=None,
+        trace_memory=True,
+        hook=lambda event, stage: events.append((event, stage.name)),
+    )
+
+    stages = config.stats.stages
+    assert list(stages) == [
+        'spec', 'preprocess', 'parse', 'validate', 'parser', 'errortree', 'tables', 'render'
+    ]
+    assert all(stage.wall_time >= 0 for stage in stages.values())
+    assert all(stage.memory_peak is not None for stage in stages.values())
+    assert stages['parser'].nodes == len(config.metaconf)
+    assert config.stats.wall_time == sum(stage.wall_time for stage in stages.values())
+
+    # Every stage is wrapped in a start and end event
+    assert events[:2] == [('start', 'spec'), ('end', 'spec')]
+    assert len(events) == 2 * len(stages)
+
+def test_stats_end_on_error():
+    with open(CONFIG_PATH_1) as f:
+        config_str = f.read().replace('port = 3021', 'port = 4')
+    events = []
+
+    with pytest.raises(tc.ConfigValidationError):
+        tc.TermaConfig(
+            io.StringIO(config_str),
+            SPEC_PATH_1,
+            output=None,
+            hook=lambda event, stage: events.append((event, stage.name)),
+        )
+    # The failing stage still reports its end
+    assert events[-2:] == [('start', 'errortree'), ('end', 'errortree')]
+
+if __name__ == '__main__':
+    pytest.main()
@@ -0,0 +1,53 @@
+# tests/test_structured.py
+
+import io
+import json
+
+import pytest
+
+import termaconfig as tc
+
+CONFIG_PATH_1 = 'tests/valid-configs/example-config.toml'
+SPEC_PATH_1 = 'tests/valid-configs/example-spec.toml'
+
+def test_option_records():
+    lines = []
+    config = tc.TermaConfig(CONFIG_PATH_1, SPEC_PATH_1, output=lines.append, output_format='ndjson')
+
+    # One record per option, and no tables were built
+    records = [json.loads(line) for line in lines]
+    assert [record['path'] for record in records] == [
+        f'{section}.{key}' for section, details in config.metaconf.items() for key in details['data']
+    ]
+    assert records[5] == {'kind': 'option', 'path': 'basic.other.port', **dict(config.index.get('basic.other.port'))}
+    assert config._config_tables is None
+
+    lines = []
+    tc.TermaConfig(CONFIG_PATH_1, SPEC_PATH_1, output=lines.append, output_format='json')
+    assert len(lines) == 1 and json.loads(lines[0]) == records
+
+    with pytest.raises(ValueError):
+        tc.TermaConfig(CONFIG_PATH_1, SPEC_PATH_1, output=None, output_format='xml')
+    # Error budgets are checked up front, whatever the output format
+    for max_errors in (0, -1, '2', True):
+        with pytest.raises(ValueError):
+            tc.TermaConfig(CONFIG_PATH_1, SPEC_PATH_1, output=None, output_format='ndjson',
+                           max_errors=max_errors)
+
+def test_error_records():
+    lines = []
+    invalid = io.StringIO('[basic]\n[[other]]\nport = 4\n')
+    with pytest.raises(tc.ConfigValidationError):
+        tc.TermaConfig(invalid, SPEC_PATH_1, output=lines.append, output_format='ndjson')
+
+    records = [json.loads(line) for line in lines]
+    assert [(record['path'], record['missing']) for record in records] == [
+        ('basic.other.port', False), ('basic.other.ip', True)
+    ]
+    assert records[0]['error'] == 'the value "4" is too small.'
+    assert records[0]['min'] == '1024'
+    assert not any('\033' in line for line in lines)
+
+
+if __name__ == '__main__':
+    pytest.main()
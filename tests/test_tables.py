@@ -0,0 +1,170 @@
+# tests/test_tables.py
+
+import io
+from copy import deepcopy
+
+import pytest
+from terminaltables3 import (AsciiTable, DoubleTable, GithubFlavoredMarkdownTable, PorcelainTable,
+                             SingleTable)
+
+import termaconfig as tc
+
+from tests.utils import TermaConfigTests
+
+CONFIG_PATH_1 = 'tests/valid-configs/example-config.toml'
+SPEC_PATH_1 = 'tests/valid-configs/example-spec.toml'
+
+def test_lazy_table_rendering():
+    drawn = []
+
+    class CountingTable(AsciiTable):
+        def __init__(self, *args, **kwargs):
+            super().__init__(*args, **kwargs)
+            drawn.append(self)
+
+    instance = TermaConfigTests(CONFIG_PATH_1, SPEC_PATH_1)
+    tables = tc.ConfigTables(instance.metaconf, instance, tabletype=CountingTable)
+
+    # Nothing is rendered until it's asked for
+    assert drawn == []
+
+    # ...and then only once, however it's looked up
+    info_str = tables.render('info')
+    assert tables.render('info') is info_str
+    assert tables.tabledata['info']['tablestr'] is info_str
+    assert len(drawn) == 1
+
+    # Changing the section data renders it again
+    tables.tabledata['info']['title'] = 'Other Info'
+    assert tables.render('info').startswith('+Other Info')
+    assert len(drawn) == 2
+
+    assert tables.render('ignored_section') is None
+    with pytest.raises(KeyError):
+        tables.render('basic.other')
+
+def test_tables_leave_metaconf_alone():
+    instance = TermaConfigTests(CONFIG_PATH_1, SPEC_PATH_1)
+    metaconf = deepcopy(instance.metaconf)
+    tables = tc.ConfigTables(instance.metaconf, instance, tabletype=AsciiTable)
+    assert tables.all_tables
+
+    assert instance.metaconf == metaconf
+    # Untouched sections share their data with metaconf instead of copying it
+    assert tables.tabledata['info']['data'] is instance.metaconf['info']['data']
+    assert tables.tabledata['basic']['data'] is not instance.metaconf['basic']['data']
+
+def test_table_output_sink():
+    lines = []
+    config = tc.TermaConfig(CONFIG_PATH_1, SPEC_PATH_1, tabletype=AsciiTable, output=lines.append)
+
+    tables = list(config.config_tables.iter_tables())
+    assert len(tables) == 3
+    assert lines == [''] + '\n'.join(tables).splitlines()
+
+    # Streams get the blank lines print() used to leave around the tables
+    stream = io.StringIO()
+    tc.TermaConfig(CONFIG_PATH_1, SPEC_PATH_1, tabletype=AsciiTable, output=stream)
+    assert stream.getvalue() == '\n' + '\n'.join(tables) + '\n\n'
+
+PAGED_SPEC = """
+[main]
+__title = "Main"
+[[items]]
+__type = "list_values"
+__title = "Items"
+__parent = "main"
+__limit = 3
+[vars]
+__type = "variable"
+__title = "Vars"
+__limit = 2
+"""
+
+def test_section_paging():
+    config = '[main]\n[[items]]\n' + ''.join(f'k{i} = v{i}\n' for i in range(10))
+    config += '[vars]\n' + ''.join(f'a{i} = {i}\n' for i in range(5))
+    instance = tc.TermaConfig(
+        io.StringIO(config), io.StringIO(PAGED_SPEC), tabletype=AsciiTable, output=None
+    )
+    tables = instance.config_tables
+
+    # Only the first page is shown, with a summary of what's left
+    assert '| Items | v0, v1, v2   |' in tables.all_tables
+    assert '… and 7 more' in tables.all_tables
+    assert '| a1           | 1 |' in tables.all_tables
+    assert '… and 3 more' in tables.all_tables
+
+    # Other pages render into their parent table
+    last_page = tables.render_page('main.items', 4)
+    assert '| Items | v9 |' in last_page and 'more' not in last_page
+    assert '| a4 | 4 |' in tables.render_page('vars', 3)
+
+    with pytest.raises(ValueError):
+        tables.render_page('main', 1)
+    with pytest.raises(ValueError):
+        tables.render_page('vars', 0)
+
+CHAINED_SPEC = """
+[c]
+__title = "C"
+z = "integer(default=3)"
+[b]
+__parent = "c"
+__title = "B"
+__type = "list_values"
+[a]
+__parent = "b"
+__title = "A"
+x = "integer(default=1)"
+"""
+
+def test_parent_chains():
+    # Parents are listed before their children, and b has a __type that replaces its own entries
+    config = tc.TermaConfig(
+        io.StringIO('[b]\nk1 = v1\nk2 = v2\n'), io.StringIO(CHAINED_SPEC), tabletype=AsciiTable,
+        output=None
+    )
+    assert config.spec.section_graph.order == ('a', 'b', 'c')
+    assert list(config.tabledata) == ['c']
+    rows = config.tabledata['c']['tablerows']
+    assert [row[0] for row in rows] == ['z', 'B', 'A', 'x']
+    assert rows[1] == ['B', 'v1, v2']
+
+    with pytest.raises(ValueError):
+        tc.SectionGraph({'a': {'parent': 'b', 'toggle': None}, 'b': {'parent': 'a', 'toggle': None}})
+
+@pytest.mark.parametrize('tabletype, native', [
+    (AsciiTable, tc.NativeAsciiTable),
+    (SingleTable, tc.NativeSingleTable),
+    (DoubleTable, tc.NativeDoubleTable),
+])
+def test_native_tables_match(tabletype, native):
+    instance = TermaConfigTests(CONFIG_PATH_1, SPEC_PATH_1)
+    expected = tc.ConfigTables(instance.metaconf, instance, tabletype=tabletype).all_tables
+    assert tc.ConfigTables(instance.metaconf, instance, tabletype=native).all_tables == expected
+
+    # Options and titles that don't fit are handled the same way too
+    rows = [['Option', 'Value'], ['漢字', 'multi\nline'], ['\033[1mbold\033[0m', '']]
+    for title in (None, 'A title much wider than the first column'):
+        expected_table, native_table = tabletype(rows, title), native(rows, title)
+        for table in (expected_table, native_table):
+            table.inner_row_border = True
+            table.justify_columns = {1: 'right'}
+        assert native_table.table == expected_table.table
+
+def test_native_table_unsupported():
+    # Only the border characters are copied, so classes drawing tables differently are rejected
+    for table_class in (GithubFlavoredMarkdownTable, PorcelainTable):
+        with pytest.raises(tc.TableTypeError):
+            tc.native_table(table_class)
+
+    class DottedTable(AsciiTable):
+        CHAR_OUTER_TOP_HORIZONTAL = '='
+
+    rows = [['Option', 'Value'], ['a', 'b']]
+    assert tc.native_table(DottedTable)(rows).table == DottedTable(rows).table
+
+
+if __name__ == '__main__':
+    pytest.main()